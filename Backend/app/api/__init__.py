@@ -3,4 +3,5 @@ from . import auth
 from . import stations
 from . import crowd_reports
 from . import predictions
-from . import analytics
\ No newline at end of file
+from . import analytics
+from . import export
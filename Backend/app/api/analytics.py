@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from ..database import get_database
 from ..services.analytics_service import analytics_service
+from ..services.overview_snapshot import overview_snapshot
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
@@ -21,4 +22,16 @@ async def get_system_overview():
     if db is None:
         raise HTTPException(status_code=500, detail="Database connection failed")
     
-    return await analytics_service.get_system_overview(db)
\ No newline at end of file
+    return await overview_snapshot.get(db)
+
+@router.get("/heatmap")
+async def get_network_heatmap(days: int = 28):
+    """Stations x 168 hour-of-week matrix of average crowd level and report counts"""
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database connection failed")
+    
+    if not 1 <= days <= 365:
+        raise HTTPException(status_code=400, detail="days must be between 1 and 365")
+    
+    return await analytics_service.get_network_heatmap(db, days)
\ No newline at end of file
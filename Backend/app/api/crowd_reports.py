@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response
+from typing import List, Optional
 from datetime import datetime, timedelta
 from bson import ObjectId
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+from ..config import settings
 from ..database import get_database
 from ..models.crowd_report import CrowdReport
 from ..models.station import Station
-from ..schemas.crowd_report import CrowdReportCreate, CrowdReportResponse
+from ..schemas.crowd_report import CrowdReportBulkCreate, CrowdReportBulkResponse, CrowdReportCreate, CrowdReportResponse
+from ..services.report_events import on_report_created, on_reports_created
+from ..services.station_cache import station_cache
 from ..utils.dependencies import get_current_user
+from ..utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, seek_filter, sort_keys
 
 router = APIRouter(prefix="/api/crowd-reports", tags=["crowd-reports"])
 
@@ -21,11 +27,11 @@ async def create_crowd_report(
     
     # Verify station exists
     try:
-        station_obj_id = ObjectId(report.station_id)
+        ObjectId(report.station_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid station ID format")
     
-    station = await db.stations.find_one({"_id": station_obj_id})
+    station = await station_cache.get(db, report.station_id)
     if not station:
         raise HTTPException(status_code=404, detail="Station not found")
     
@@ -40,6 +46,9 @@ async def create_crowd_report(
     
     result = await db.crowd_reports.insert_one(report_dict)
     
+    # Update feature store and caches derived from crowd reports
+    await on_report_created(db, report_dict)
+    
     # Return created report
     created_report = await db.crowd_reports.find_one({"_id": result.inserted_id})
     if not created_report:
@@ -54,10 +63,97 @@ async def create_crowd_report(
         "created_at": created_report["created_at"]
     }
 
+@router.post("/bulk", response_model=CrowdReportBulkResponse)
+async def create_crowd_reports_bulk(
+    batch: CrowdReportBulkCreate,
+    current_user = Depends(get_current_user)
+):
+    """
+    Store many crowd reports at once; each item gets its own result, so
+    invalid items or unknown stations do not fail the rest of the batch
+    """
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database connection failed")
+    
+    if len(batch.reports) > settings.BULK_REPORTS_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.BULK_REPORTS_MAX_ITEMS} reports per request"
+        )
+    
+    results = [{"index": index, "status": "error"} for index in range(len(batch.reports))]
+    
+    # Validate items on their own
+    valid = []
+    for index, item in enumerate(batch.reports):
+        if not isinstance(item, dict):
+            results[index]["error"] = "Report must be an object"
+            continue
+        try:
+            report = CrowdReportCreate.model_validate(item)
+            # Canonical id, so it matches the station_cache.get_many keys
+            report.station_id = str(ObjectId(report.station_id))
+        except ValidationError as e:
+            results[index]["error"] = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            )
+            continue
+        except Exception:
+            results[index]["error"] = "Invalid station ID format"
+            continue
+        valid.append((index, report))
+    
+    # Verify every referenced station with one lookup
+    stations = await station_cache.get_many(db, [report.station_id for _, report in valid])
+    
+    now = datetime.utcnow()
+    indexes, documents = [], []
+    for index, report in valid:
+        if report.station_id not in stations:
+            results[index]["error"] = "Station not found"
+            continue
+        indexes.append(index)
+        documents.append({
+            "station_id": report.station_id,
+            "user_id": str(current_user.id),
+            "crowd_level": report.crowd_level,
+            "description": report.description,
+            "created_at": now
+        })
+    
+    # Unordered insert: one failing document does not stop the others
+    failed_positions = {}
+    if documents:
+        try:
+            await db.crowd_reports.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            failed_positions = {error["index"]: error["errmsg"] for error in e.details["writeErrors"]}
+    
+    created = []
+    for position, (index, document) in enumerate(zip(indexes, documents)):
+        if position in failed_positions:
+            results[index]["error"] = failed_positions[position]
+            continue
+        results[index] = {"index": index, "status": "created", "id": str(document["_id"])}
+        created.append(document)
+    
+    # Update feature store and caches derived from crowd reports, batched
+    await on_reports_created(db, created)
+    
+    return {
+        "created": len(created),
+        "failed": len(results) - len(created),
+        "results": results
+    }
+
 @router.get("/station/{station_id}", response_model=List[CrowdReportResponse])
 async def get_station_reports(
     station_id: str,
-    hours: int = 24
+    response: Response,
+    hours: int = 24,
+    limit: int = 100,
+    cursor: Optional[str] = None
 ):
     db = get_database()
     if db is None:
@@ -70,12 +166,20 @@ async def get_station_reports(
         raise HTTPException(status_code=400, detail="Invalid station ID format")
     
     since = datetime.utcnow() - timedelta(hours=hours)
-    cursor = db.crowd_reports.find({
+    query = {
         "station_id": station_id,
         "created_at": {"$gte": since}
-    }).sort("created_at", -1)
+    }
+    if cursor:
+        try:
+            query = {"$and": [query, seek_filter(decode_cursor(cursor), "created_at", descending=True)]}
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
     
-    reports = await cursor.to_list(length=100)
+    results = db.crowd_reports.find(query).sort(sort_keys("created_at", descending=True)).limit(limit)
+    reports = await results.to_list(length=limit)
+    if reports and len(reports) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(reports[-1], "created_at")
     
     return [
         {
@@ -91,14 +195,48 @@ async def get_station_reports(
 
 @router.get("/recent", response_model=List[CrowdReportResponse])
 async def get_recent_reports(
-    limit: int = 20
+    response: Response,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    order: str = "desc"
 ):
+    """
+    Latest reports first, or with order=asc oldest first for incremental
+    sync: the cursor of an ascending page is always returned, and passing it
+    back later yields only reports stored since.
+    
+    created_at is stamped before the insert commits, so concurrent writers
+    can make a report visible after one with a later (created_at, _id).
+    Ascending pages therefore only include reports older than
+    REPORT_SYNC_LAG_SECONDS, so the cursor never moves past a report that
+    is still in flight; sync clients see new reports after that delay.
+    """
     db = get_database()
     if db is None:
         raise HTTPException(status_code=500, detail="Database connection failed")
     
-    cursor = db.crowd_reports.find().sort("created_at", -1).limit(limit)
-    reports = await cursor.to_list(length=limit)
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be asc or desc")
+    descending = order == "desc"
+    
+    conditions = []
+    if cursor:
+        try:
+            conditions.append(seek_filter(decode_cursor(cursor), "created_at", descending))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not descending:
+        settled = datetime.utcnow() - timedelta(seconds=settings.REPORT_SYNC_LAG_SECONDS)
+        conditions.append({"created_at": {"$lte": settled}})
+    query = {"$and": conditions} if len(conditions) > 1 else (conditions[0] if conditions else {})
+    
+    results = db.crowd_reports.find(query).sort(sort_keys("created_at", descending)).limit(limit)
+    reports = await results.to_list(length=limit)
+    if reports and (len(reports) == limit or not descending):
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(reports[-1], "created_at")
+    elif cursor and not descending:
+        # Nothing new yet: keep polling from the same position
+        response.headers[NEXT_CURSOR_HEADER] = cursor
     
     return [
         {
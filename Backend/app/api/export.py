@@ -0,0 +1,57 @@
+from datetime import datetime
+from typing import Optional
+
+from bson import ObjectId
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from ..database import get_database
+from ..services.export_service import DATASETS, FORMATS, export_service
+
+router = APIRouter(prefix="/api/export", tags=["export"])
+
+@router.get("/{dataset}")
+async def export_data(
+    dataset: str,
+    fmt: str = Query("ndjson", alias="format"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    station_ids: Optional[str] = None,
+    after_id: Optional[str] = None
+):
+    """
+    Stream crowd-reports or predictions in [start, end) as NDJSON, CSV or
+    Parquet, ordered by time; resume with the id of the last row received
+    """
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database connection failed")
+    
+    if dataset not in DATASETS:
+        raise HTTPException(status_code=404, detail="Unknown export dataset")
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(FORMATS)}")
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+    
+    ids = None
+    if station_ids:
+        ids = list(dict.fromkeys(s.strip() for s in station_ids.split(",") if s.strip()))
+    try:
+        for object_id in (ids or []) + ([after_id] if after_id else []):
+            ObjectId(object_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid ID format")
+    
+    query = await export_service.build_query(db, dataset, start, end, ids, after_id)
+    if query is None:
+        raise HTTPException(status_code=404, detail="Resume row not found")
+    
+    return StreamingResponse(
+        export_service.stream(db, dataset, query, fmt),
+        media_type=FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{fmt}"'}
+    )
@@ -1,13 +1,20 @@
 # backend/app/api/predictions.py
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response
+from typing import List, Optional
 from datetime import datetime, timedelta
 from bson import ObjectId
 from ..database import get_database
 from ..models.prediction import Prediction
 from ..models.station import Station
 from ..schemas.prediction import PredictionResponse, PredictionRequest, HourlyPredictionResponse
+from ..services.forecast_materializer import forecast_materializer
+from ..services.latency import latency
+from ..services.model_registry import model_registry
+from ..services.prediction_cache import prediction_cache
 from ..services.prediction_service import prediction_service
+from ..services.station_cache import station_cache
+from ..services.training_jobs import training_jobs
+from ..utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 
 router = APIRouter(prefix="/api/predictions", tags=["predictions"])
 
@@ -15,26 +22,32 @@ router = APIRouter(prefix="/api/predictions", tags=["predictions"])
 async def create_prediction(
     request: PredictionRequest
 ):
+    with latency.request("predict"):
+        return await _create_prediction(request)
+
+async def _create_prediction(request: PredictionRequest):
     db = get_database()
     if db is None:
         raise HTTPException(status_code=500, detail="Database connection failed")
     
     # Verify station exists
     try:
-        station_obj_id = ObjectId(request.station_id)
+        ObjectId(request.station_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid station ID format")
     
-    station = await db.stations.find_one({"_id": station_obj_id})
+    with latency.stage("station_lookup"):
+        station = await station_cache.get(db, request.station_id)
     if not station:
         raise HTTPException(status_code=404, detail="Station not found")
     
     # Generate prediction using the enhanced prediction service
     target_time = datetime.utcnow() + timedelta(hours=request.hours_ahead)
-    prediction_result = await prediction_service.predict_crowd_level(
-        station_id=request.station_id,
-        target_time=target_time
-    )
+    with latency.stage("predict"):
+        prediction_result = await prediction_service.predict_crowd_level(
+            station_id=request.station_id,
+            target_time=target_time
+        )
     
     # Save prediction to database
     prediction_dict = {
@@ -45,7 +58,8 @@ async def create_prediction(
         "created_at": datetime.utcnow()
     }
     
-    result = await db.predictions.insert_one(prediction_dict)
+    with latency.stage("insert"):
+        result = await db.predictions.insert_one(prediction_dict)
     
     # Return the prediction with factors
     return {
@@ -63,31 +77,76 @@ async def get_hourly_predictions(
     station_id: str,
     hours: int = 24
 ):
+    with latency.request("hourly"):
+        return await _get_hourly_predictions(station_id, hours)
+
+async def _get_hourly_predictions(station_id: str, hours: int):
     db = get_database()
     if db is None:
         raise HTTPException(status_code=500, detail="Database connection failed")
     
     # Verify station exists
     try:
-        station_obj_id = ObjectId(station_id)
+        ObjectId(station_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid station ID format")
     
-    station = await db.stations.find_one({"_id": station_obj_id})
+    with latency.stage("station_lookup"):
+        station = await station_cache.get(db, station_id)
     if not station:
         raise HTTPException(status_code=404, detail="Station not found")
     
-    predictions = await prediction_service.get_hourly_predictions(
-        station_id=station_id,
-        hours_ahead=hours
-    )
+    # Serve precomputed forecasts, running the model only on a miss
+    with latency.stage("materialized_lookup"):
+        predictions = await forecast_materializer.get_hourly(db, station_id, hours)
+    if predictions is None:
+        predictions = await prediction_service.get_hourly_predictions(
+            station_id=station_id,
+            hours_ahead=hours
+        )
+    else:
+        latency.set_path("materialized")
     
     return {"station_id": station_id, "predictions": predictions}
 
+@router.get("/network")
+async def get_network_predictions(
+    hours: int = 24,
+    station_ids: Optional[str] = None
+):
+    """Forecast grid for all (or a comma-separated list of) stations"""
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database connection failed")
+    
+    if not 1 <= hours <= 168:
+        raise HTTPException(status_code=400, detail="hours must be between 1 and 168")
+    
+    ids = None
+    if station_ids:
+        ids = list(dict.fromkeys(s.strip() for s in station_ids.split(",") if s.strip()))
+        try:
+            ids = list(dict.fromkeys(str(ObjectId(station_id)) for station_id in ids))
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid station ID format")
+        
+        # Unknown ids would otherwise be forecast from empty profiles
+        stations = await station_cache.get_many(db, ids)
+        unknown = [station_id for station_id in ids if station_id not in stations]
+        if unknown:
+            raise HTTPException(status_code=404, detail=f"Station not found: {', '.join(unknown)}")
+    
+    return await prediction_service.get_network_predictions(
+        hours_ahead=hours,
+        station_ids=ids
+    )
+
 @router.get("/station/{station_id}", response_model=List[PredictionResponse])
 async def get_station_predictions(
     station_id: str,
-    limit: int = 10
+    response: Response,
+    limit: int = 10,
+    cursor: Optional[str] = None
 ):
     db = get_database()
     if db is None:
@@ -99,11 +158,17 @@ async def get_station_predictions(
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid station ID format")
     
-    cursor = db.predictions.find({
-        "station_id": station_id
-    }).sort("created_at", -1).limit(limit)
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
     
-    predictions = await cursor.to_list(length=limit)
+    # Upcoming stored and materialized forecasts, the latter computed on a miss
+    predictions = await forecast_materializer.get_upcoming(db, station_id, limit, after)
+    if predictions and len(predictions) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(predictions[-1], "prediction_time")
     
     return [
         {
@@ -118,37 +183,52 @@ async def get_station_predictions(
         for pred in predictions
     ]
 
-@router.post("/train/{station_id}")
+@router.post("/train/{station_id}", status_code=202)
 async def train_model_for_station(station_id: str):
-    """Train the prediction model with data for a specific station"""
+    """Queue a training job for a station-specific model"""
     db = get_database()
     if db is None:
         raise HTTPException(status_code=500, detail="Database connection failed")
     
     # Verify station exists
     try:
-        station_obj_id = ObjectId(station_id)
+        ObjectId(station_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid station ID format")
     
-    station = await db.stations.find_one({"_id": station_obj_id})
+    station = await station_cache.get(db, station_id)
     if not station:
         raise HTTPException(status_code=404, detail="Station not found")
     
-    # Train model
-    success = await prediction_service.train_model_with_data(station_id)
-    
-    if success:
-        return {"message": f"Model trained successfully for station {station_id}"}
-    else:
-        raise HTTPException(status_code=400, detail="Insufficient data for training")
+    job = await training_jobs.submit(station_id)
+    return {"job_id": job["id"], "status": job["status"]}
 
-@router.post("/train-all")
+@router.post("/train-all", status_code=202)
 async def train_model_all_stations():
-    """Train the prediction model with data from all stations"""
-    success = await prediction_service.train_model_with_data()
-    
-    if success:
-        return {"message": "Model trained successfully with all station data"}
-    else:
-        raise HTTPException(status_code=400, detail="Insufficient data for training")
+    """Queue a training job with data from all stations"""
+    job = await training_jobs.submit()
+    return {"job_id": job["id"], "status": job["status"]}
+
+@router.get("/jobs/{job_id}")
+async def get_training_job(job_id: str):
+    """Status, progress and metrics of a training job"""
+    job = await training_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    
+    return job
+
+@router.get("/cache/stats")
+async def get_prediction_cache_stats():
+    """Hit/miss counters and size of the prediction cache"""
+    return prediction_cache.stats()
+
+@router.get("/latency")
+async def get_prediction_latency():
+    """Per-stage latency percentiles of the prediction endpoints"""
+    return latency.snapshot()
+
+@router.get("/models")
+async def get_model_registry_stats():
+    """Resident station models and registry memory usage"""
+    return model_registry.stats()
@@ -1,51 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response
+from typing import Dict, List, Optional
 from bson import ObjectId
 from ..database import get_database
 from ..models.station import Station
 from ..models.crowd_report import CrowdReport
-from ..schemas.station import StationCreate, StationResponse
+from ..schemas.station import NearbyStationResponse, StationCreate, StationResponse
+from ..services.forecast_materializer import forecast_materializer
+from ..services.live_state import live_state
+from ..services.report_rollups import report_rollups
+from ..services.station_cache import station_cache
+from ..services.station_locator import geo_point, station_locator
 from ..utils.dependencies import get_current_user
+from ..utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, seek_filter, sort_keys
 from datetime import datetime, timedelta
 import pymongo
 
 router = APIRouter(prefix="/api/stations", tags=["stations"])
 
+async def _current_levels(db, station_ids: List[str]) -> Dict[str, float]:
+    """Current crowd levels from live state, or from rollups until it is seeded"""
+    if live_state.ready:
+        return live_state.current_levels(station_ids)
+    return await report_rollups.current_levels(db, station_ids)
+
 @router.get("/", response_model=List[StationResponse])
 async def get_stations(
+    response: Response,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = None
 ):
     db = get_database()
     if db is None:
         raise HTTPException(status_code=500, detail="Database connection failed")
     
+    # Seek past the cursor instead of skipping, so every page costs the same
+    query = {}
+    if cursor:
+        try:
+            query = seek_filter(decode_cursor(cursor))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    
     # Get stations from MongoDB
-    cursor = db.stations.find().skip(skip).limit(limit)
-    stations = await cursor.to_list(length=limit)
+    results = db.stations.find(query).sort(sort_keys()).skip(skip).limit(limit)
+    stations = await results.to_list(length=limit)
+    if stations and len(stations) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(stations[-1])
+    
+    # Current crowd levels for the whole page at once
+    levels = await _current_levels(db, [str(station["_id"]) for station in stations])
     
-    # Add current crowd level for each station
     result = []
     for station in stations:
-        # Get average crowd level from last hour
-        last_hour = datetime.utcnow() - timedelta(hours=1)
-        pipeline = [
-            {
-                "$match": {
-                    "station_id": str(station["_id"]),
-                    "created_at": {"$gte": last_hour}
-                }
-            },
-            {
-                "$group": {
-                    "_id": None,
-                    "avg_crowd": {"$avg": "$crowd_level"}
-                }
-            }
-        ]
-        
-        crowd_result = await db.crowd_reports.aggregate(pipeline).to_list(1)
-        avg_crowd = crowd_result[0]["avg_crowd"] if crowd_result else None
+        avg_crowd = levels.get(str(station["_id"]))
         
         station_dict = {
             "id": str(station["_id"]),
@@ -61,6 +69,63 @@ async def get_stations(
     
     return result
 
+@router.get("/nearby", response_model=List[NearbyStationResponse])
+async def get_nearby_stations(
+    latitude: float,
+    longitude: float,
+    radius_m: float = 2000,
+    limit: int = 10,
+    hours_ahead: int = 1
+):
+    """Nearest stations within a radius with their current and predicted crowd levels"""
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database connection failed")
+    
+    if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        raise HTTPException(status_code=400, detail="Invalid coordinates")
+    if not 0 < radius_m <= 50000:
+        raise HTTPException(status_code=400, detail="radius_m must be between 0 and 50000")
+    if not 1 <= limit <= 100:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 100")
+    if not 0 <= hours_ahead <= 23:
+        raise HTTPException(status_code=400, detail="hours_ahead must be between 0 and 23")
+    
+    nearest = await station_locator.nearest(db, latitude, longitude, radius_m, limit)
+    station_ids = [str(station["_id"]) for _, station in nearest]
+    
+    # Live levels and the materialized forecast slot, each resolved for all stations at once
+    prediction_time = datetime.utcnow() + timedelta(hours=hours_ahead)
+    levels = await _current_levels(db, station_ids)
+    forecasts = {}
+    if station_ids:
+        rows = await forecast_materializer.get_slot(db, station_ids, prediction_time)
+        forecasts = {station_id: row["predicted_crowd_level"] for station_id, row in rows.items()}
+        missing = [station_id for station_id in station_ids if station_id not in forecasts]
+        if missing:
+            # Stations without a fresh forecast are predicted together in one batch
+            forecasts.update(await forecast_materializer.predict_slot(db, missing, prediction_time))
+    
+    result = []
+    for (distance, station), station_id in zip(nearest, station_ids):
+        avg_crowd = levels.get(station_id)
+        forecast = forecasts.get(station_id)
+        result.append({
+            "id": station_id,
+            "name": station["name"],
+            "line": station["line"],
+            "latitude": station["latitude"],
+            "longitude": station["longitude"],
+            "station_type": station["station_type"],
+            "created_at": station["created_at"],
+            "current_crowd_level": round(float(avg_crowd), 2) if avg_crowd else None,
+            "distance_m": round(distance, 1),
+            "predicted_crowd_level": forecast,
+            "prediction_time": prediction_time if forecast is not None else None
+        })
+    
+    return result
+
 @router.get("/{station_id}", response_model=StationResponse)
 async def get_station(station_id: str):
     db = get_database()
@@ -69,33 +134,16 @@ async def get_station(station_id: str):
     
     # Validate ObjectId
     try:
-        obj_id = ObjectId(station_id)
+        ObjectId(station_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid station ID format")
     
-    station = await db.stations.find_one({"_id": obj_id})
+    station = await station_cache.get(db, station_id)
     if not station:
         raise HTTPException(status_code=404, detail="Station not found")
     
     # Get current crowd level
-    last_hour = datetime.utcnow() - timedelta(hours=1)
-    pipeline = [
-        {
-            "$match": {
-                "station_id": station_id,
-                "created_at": {"$gte": last_hour}
-            }
-        },
-        {
-            "$group": {
-                "_id": None,
-                "avg_crowd": {"$avg": "$crowd_level"}
-            }
-        }
-    ]
-    
-    crowd_result = await db.crowd_reports.aggregate(pipeline).to_list(1)
-    avg_crowd = crowd_result[0]["avg_crowd"] if crowd_result else None
+    avg_crowd = (await _current_levels(db, [station_id])).get(station_id)
     
     station_dict = {
         "id": str(station["_id"]),
@@ -122,6 +170,7 @@ async def create_station(
     # Create station document
     station_dict = station.dict()
     station_dict["created_at"] = datetime.utcnow()
+    station_dict["location"] = geo_point(station.latitude, station.longitude)
     
     result = await db.stations.insert_one(station_dict)
     
@@ -131,6 +180,8 @@ async def create_station(
     if not created_station:
         raise HTTPException(status_code=500, detail="Failed to create station")
     
+    station_cache.add(created_station)
+    
     return {
         "id": str(created_station["_id"]),
         "name": created_station["name"],
@@ -9,6 +9,43 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REDIS_URL: Optional[str] = "redis://localhost:6379"
     TRANSIT_API_KEY: Optional[str] = None
+    FEATURE_WINDOW_DAYS: int = 30
+    FEATURE_STORE_REFRESH_SECONDS: int = 60
+    TRAINING_MAX_WORKERS: int = 1
+    TRAINING_N_JOBS: int = -1
+    TRAINING_BATCH_SIZE: int = 10000
+    TRAINING_MODE: str = "full"  # full (random forest) or incremental (streamed linear)
+    MODEL_DIR: str = "models"
+    MODEL_MMAP: bool = True  # memory-map stored forest arrays (INFERENCE_ENGINE=compiled)
+    MODEL_KEEP_VERSIONS: int = 5
+    MODEL_WARMUP_ON_STARTUP: bool = True
+    MODEL_RELOAD_CHECK_SECONDS: int = 30
+    MODEL_REGISTRY_MEMORY_MB: int = 512
+    INFERENCE_ENGINE: str = "sklearn"  # sklearn or compiled (array-backed forest evaluator)
+    PREDICTION_CACHE_ENABLED: bool = True
+    PREDICTION_CACHE_MAX_ENTRIES: int = 10000
+    PREDICTION_CACHE_TTL_SECONDS: int = 300
+    PREDICTION_CACHE_BUCKET_MINUTES: int = 15
+    FORECAST_MATERIALIZE_ENABLED: bool = True
+    FORECAST_HORIZON_HOURS: int = 24
+    FORECAST_REFRESH_SECONDS: int = 900
+    FORECAST_MAX_AGE_SECONDS: int = 3600
+    FORECAST_RETENTION_DAYS: int = 7
+    LATENCY_METRICS_ENABLED: bool = True
+    LATENCY_LOG_ENABLED: bool = False
+    OVERVIEW_REFRESH_SECONDS: int = 60
+    OVERVIEW_MIN_REFRESH_SECONDS: int = 5
+    EXPORT_CHUNK_SIZE: int = 5000
+    BULK_REPORTS_MAX_ITEMS: int = 5000
+    HEATMAP_CACHE_SECONDS: int = 300
+    LIVE_STATE_ENABLED: bool = True
+    LIVE_STATE_WINDOW_MINUTES: int = 60
+    LIVE_STATE_CAPACITY: int = 512  # reports buffered per station
+    LIVE_STATE_RESYNC_SECONDS: int = 300  # 0 seeds once at startup
+    NEARBY_SEARCH_BACKEND: str = "mongo"  # mongo ($geoNear on the 2dsphere index) or memory (in-process grid)
+    NEARBY_GRID_CELL_DEGREES: float = 0.01
+    STATION_CACHE_REFRESH_SECONDS: int = 300
+    REPORT_SYNC_LAG_SECONDS: int = 10  # ascending report sync holds back reports younger than this
     
     class Config:
         env_file = ".env"
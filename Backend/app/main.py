@@ -1,9 +1,17 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .api import analytics, auth, crowd_reports, predictions, stations
+from .api import analytics, auth, crowd_reports, export, predictions, stations
 from .config import settings
 from .database import connect_to_mongo, close_mongo_connection
+from .services.forecast_materializer import forecast_materializer
+from .services.live_state import live_state
+from .services.overview_snapshot import overview_snapshot
+from .services.prediction_service import prediction_service
+from .services.station_cache import station_cache
+from .services.training_jobs import training_jobs
 
 app = FastAPI(
     title="Crowd Prediction API",
@@ -17,18 +25,32 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
 @app.on_event("startup")
 async def on_startup() -> None:
-    """Initialize database connection on startup"""
+    """Initialize database connection, warm up the model and start background refreshes"""
     await connect_to_mongo()
+    station_cache.start()
+    if settings.MODEL_WARMUP_ON_STARTUP:
+        # Load the model in the background so /health answers immediately
+        asyncio.get_running_loop().run_in_executor(None, prediction_service.load_model)
+    if settings.FORECAST_MATERIALIZE_ENABLED:
+        forecast_materializer.start()
+    overview_snapshot.start()
+    live_state.start()
 
 
 @app.on_event("shutdown")
 async def on_shutdown() -> None:
-    """Close database connection on shutdown"""
+    """Stop background work and close database connection on shutdown"""
+    await forecast_materializer.stop()
+    await overview_snapshot.stop()
+    await live_state.stop()
+    await station_cache.stop()
+    training_jobs.shutdown()
     await close_mongo_connection()
 
 
@@ -42,3 +64,4 @@ app.include_router(stations.router)
 app.include_router(crowd_reports.router)
 app.include_router(predictions.router)
 app.include_router(analytics.router)
+app.include_router(export.router)
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Any, List, Optional
 
 class CrowdReportBase(BaseModel):
     station_id: str
@@ -16,4 +16,19 @@ class CrowdReportResponse(CrowdReportBase):
     created_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class CrowdReportBulkCreate(BaseModel):
+    # Items are validated one by one so a bad item, even a non-object, fails alone
+    reports: List[Any]
+
+class CrowdReportBulkItemResult(BaseModel):
+    index: int
+    status: str  # created or error
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class CrowdReportBulkResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[CrowdReportBulkItemResult]
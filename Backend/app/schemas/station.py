@@ -18,4 +18,9 @@ class StationResponse(StationBase):
     current_crowd_level: Optional[float] = None
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class NearbyStationResponse(StationResponse):
+    distance_m: float
+    predicted_crowd_level: Optional[float] = None
+    prediction_time: Optional[datetime] = None
\ No newline at end of file
@@ -1,4 +1,10 @@
 # backend/app/services/__init__.py
 from .prediction_service import prediction_service
+from .feature_store import feature_store
+from .report_rollups import report_rollups
+from .model_registry import model_registry
+from .prediction_cache import prediction_cache
+from .training_jobs import training_jobs
+from .forecast_materializer import forecast_materializer
 from .analytics_service import analytics_service
 from .transit_service import transit_service
\ No newline at end of file
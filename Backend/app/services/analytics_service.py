@@ -1,8 +1,18 @@
+import asyncio
+import time
 from datetime import datetime, timedelta
-from typing import Dict
+from typing import Dict, Tuple
 from bson import ObjectId
+from ..config import settings
+from .report_rollups import COLLECTION as ROLLUP_COLLECTION, hour_bucket, report_rollups
+
+HOURS_PER_WEEK = 168
 
 class AnalyticsService:
+    def __init__(self):
+        # days -> (expires_at, heatmap)
+        self._heatmap_cache: Dict[int, Tuple[float, Dict]] = {}
+    
     async def get_station_analytics(
         self,
         db,
@@ -18,14 +28,11 @@ class AnalyticsService:
         except Exception:
             return {"error": "Invalid station ID format"}
         
-        # Get reports for the station
-        cursor = db.crowd_reports.find({
-            "station_id": station_id,
-            "created_at": {"$gte": since}
-        })
-        reports = await cursor.to_list(length=1000)
+        # Per hour-of-day stats from the hourly rollups
+        hourly = await report_rollups.hour_of_day_stats(db, station_id, since)
+        total_reports = sum(h["count"] for h in hourly)
         
-        if not reports:
+        if not total_reports:
             return {
                 "station_id": station_id,
                 "period_days": days,
@@ -35,96 +42,71 @@ class AnalyticsService:
                 "hourly_average": {}
             }
         
-        # Calculate statistics
-        crowd_levels = [r["crowd_level"] for r in reports]
-        avg_crowd = sum(crowd_levels) / len(crowd_levels)
-        
-        # Group by hour
-        hourly_data = {}
-        for report in reports:
-            hour = report["created_at"].hour
-            if hour not in hourly_data:
-                hourly_data[hour] = []
-            hourly_data[hour].append(report["crowd_level"])
-        
-        hourly_avg = {
-            hour: sum(levels)/len(levels) 
-            for hour, levels in hourly_data.items()
-        }
+        avg_crowd = sum(h["sum"] for h in hourly) / total_reports
+        hourly_avg = {h["hour"]: h["sum"] / h["count"] for h in hourly}
         
         # Find peak hours
         peak_threshold = avg_crowd + 0.5
         peak_hours = [
-            hour for hour, avg in hourly_avg.items() 
+            hour for hour, avg in hourly_avg.items()
             if avg >= peak_threshold
         ]
         
         return {
             "station_id": station_id,
             "period_days": days,
-            "total_reports": len(reports),
+            "total_reports": total_reports,
             "average_crowd_level": round(avg_crowd, 2),
             "peak_hours": sorted(peak_hours),
             "hourly_average": {str(k): round(v, 2) for k, v in hourly_avg.items()},
-            "max_crowd_level": max(crowd_levels),
-            "min_crowd_level": min(crowd_levels)
+            "max_crowd_level": max(h["max"] for h in hourly),
+            "min_crowd_level": min(h["min"] for h in hourly)
         }
     
     async def get_system_overview(self, db) -> Dict:
         """Get system-wide analytics"""
-        # Count total stations and reports
-        total_stations = await db.stations.count_documents({})
-        total_reports = await db.crowd_reports.count_documents({})
-        
-        # Recent activity
         last_24h = datetime.utcnow() - timedelta(hours=24)
-        recent_reports = await db.crowd_reports.count_documents({
-            "created_at": {"$gte": last_24h}
-        })
         
-        # Most crowded stations - using aggregation pipeline
+        # Average crowd per station, aggregated from the hourly rollups
         pipeline = [
             {
                 "$group": {
                     "_id": "$station_id",
-                    "avg_crowd": {"$avg": "$crowd_level"},
-                    "count": {"$sum": 1}
-                }
-            },
-            {
-                "$lookup": {
-                    "from": "stations",
-                    "localField": "_id",
-                    "foreignField": "_id",
-                    "as": "station_info"
+                    "sum": {"$sum": "$sum"},
+                    "count": {"$sum": "$count"}
                 }
             },
             {
-                "$match": {
-                    "station_info": {"$ne": []}
+                "$addFields": {
+                    "avg_crowd": {"$divide": ["$sum", "$count"]}
                 }
             },
             {
                 "$sort": {"avg_crowd": -1}
-            },
-            {
-                "$limit": 5
             }
         ]
         
-        crowded_stations_cursor = db.crowd_reports.aggregate(pipeline)
-        crowded_stations = await crowded_stations_cursor.to_list(5)
+        # Independent queries run concurrently; totals use collection
+        # metadata instead of counting every document
+        total_stations, total_reports, recent_reports, station_averages, stations = await asyncio.gather(
+            db.stations.estimated_document_count(),
+            db.crowd_reports.estimated_document_count(),
+            db.crowd_reports.count_documents({"created_at": {"$gte": last_24h}}),
+            db[ROLLUP_COLLECTION].aggregate(pipeline).to_list(length=None),
+            db.stations.find({}, {"name": 1}).to_list(length=None)
+        )
         
-        # Format the results
-        formatted_crowded_stations = []
-        for station_data in crowded_stations:
-            if station_data.get("station_info") and len(station_data["station_info"]) > 0:
-                station_info = station_data["station_info"][0]
-                formatted_crowded_stations.append({
-                    "id": str(station_data["_id"]),
-                    "name": station_info["name"],
-                    "average_crowd": round(float(station_data["avg_crowd"]), 2)
-                })
+        # Most crowded stations that still exist (report station ids are strings)
+        names = {str(station["_id"]): station["name"] for station in stations}
+        formatted_crowded_stations = [
+            {
+                "id": station_data["_id"],
+                "name": names[station_data["_id"]],
+                "average_crowd": round(float(station_data["avg_crowd"]), 2)
+            }
+            for station_data in station_averages
+            if station_data["_id"] in names
+        ][:5]
         
         return {
             "total_stations": total_stations,
@@ -132,5 +114,66 @@ class AnalyticsService:
             "reports_last_24h": recent_reports,
             "most_crowded_stations": formatted_crowded_stations
         }
+    
+    async def get_network_heatmap(self, db, days: int = 28) -> Dict:
+        """
+        Average crowd level and report count per station and hour of week
+        (Monday 00:00 = 0), cached for HEATMAP_CACHE_SECONDS
+        """
+        cached = self._heatmap_cache.get(days)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        
+        import numpy as np
+        
+        since = hour_bucket(datetime.utcnow() - timedelta(days=days))
+        pipeline = [
+            {"$match": {"hour": {"$gte": since}}},
+            {
+                "$group": {
+                    "_id": {
+                        "station_id": "$station_id",
+                        # $dayOfWeek is 1 for Sunday; shift so Monday is 0
+                        "hour_of_week": {
+                            "$add": [
+                                {"$multiply": [{"$mod": [{"$add": [{"$dayOfWeek": "$hour"}, 5]}, 7]}, 24]},
+                                {"$hour": "$hour"}
+                            ]
+                        }
+                    },
+                    "sum": {"$sum": "$sum"},
+                    "count": {"$sum": "$count"}
+                }
+            }
+        ]
+        cells, stations = await asyncio.gather(
+            db[ROLLUP_COLLECTION].aggregate(pipeline, allowDiskUse=True).to_list(length=None),
+            db.stations.find({}, {"name": 1}).to_list(length=None)
+        )
+        
+        station_ids = [str(station["_id"]) for station in stations]
+        row_of = {station_id: i for i, station_id in enumerate(station_ids)}
+        cells = [cell for cell in cells if cell["_id"]["station_id"] in row_of]
+        
+        rows = np.fromiter((row_of[c["_id"]["station_id"]] for c in cells), dtype=np.intp, count=len(cells))
+        columns = np.fromiter((c["_id"]["hour_of_week"] for c in cells), dtype=np.intp, count=len(cells))
+        sums = np.zeros((len(station_ids), HOURS_PER_WEEK))
+        counts = np.zeros((len(station_ids), HOURS_PER_WEEK), dtype=np.int64)
+        sums[rows, columns] = [c["sum"] for c in cells]
+        counts[rows, columns] = [c["count"] for c in cells]
+        
+        average = np.round(sums / np.maximum(counts, 1), 2).astype(object)
+        average[counts == 0] = None
+        
+        heatmap = {
+            "period_days": days,
+            "station_ids": station_ids,
+            "station_names": [station["name"] for station in stations],
+            "average_crowd_level": average.tolist(),
+            "report_counts": counts.tolist(),
+            "generated_at": datetime.utcnow()
+        }
+        self._heatmap_cache[days] = (time.monotonic() + settings.HEATMAP_CACHE_SECONDS, heatmap)
+        return heatmap
 
 analytics_service = AnalyticsService()
\ No newline at end of file
@@ -0,0 +1,122 @@
+# backend/app/services/compiled_forest.py
+from typing import Any, Optional
+
+import numpy as np
+
+VERIFY_ROWS = 256
+VERIFY_TOLERANCE = 1e-9
+
+
+class CompiledForest:
+    """
+    A fitted RandomForestRegressor and its StandardScaler flattened into
+    NumPy node arrays.
+
+    All trees share one set of arrays (feature, threshold, left, right,
+    value) with per-tree root offsets, and rows are pushed through every
+    tree at once, one level per step. This skips sklearn's input validation
+    and per-tree joblib dispatch, which dominate single-row predictions.
+    Scaled features are rounded to float32 before comparison, as sklearn's
+    trees do, so splits resolve identically.
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        depth: int,
+        mean: np.ndarray,
+        scale: np.ndarray
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.depth = depth
+        self.mean = mean
+        self.scale = scale
+
+    @classmethod
+    def from_sklearn(cls, model: Any, scaler: Optional[Any] = None) -> "CompiledForest":
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == -1
+            roots.append(offset)
+            # Leaves point at themselves so extra traversal steps are no-ops
+            own = np.arange(offset, offset + tree.node_count)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(is_leaf, own, tree.children_left + offset))
+            rights.append(np.where(is_leaf, own, tree.children_right + offset))
+            values.append(tree.value[:, 0, 0])
+            depth = max(depth, tree.max_depth)
+            offset += tree.node_count
+
+        n_features = model.n_features_in_
+        mean = getattr(scaler, "mean_", None)
+        scale = getattr(scaler, "scale_", None)
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            value=np.concatenate(values).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            depth=depth,
+            mean=np.zeros(n_features) if mean is None else np.asarray(mean, dtype=np.float64),
+            scale=np.ones(n_features) if scale is None else np.asarray(scale, dtype=np.float64)
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of the node and scaling arrays"""
+        arrays = (self.feature, self.threshold, self.left, self.right, self.value, self.roots, self.mean, self.scale)
+        return sum(array.nbytes for array in arrays)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Forest prediction for unscaled feature rows"""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        # Same arithmetic as StandardScaler.transform, then sklearn's float32 cast
+        X_scaled = ((X - self.mean) / self.scale).astype(np.float32).astype(np.float64)
+
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.depth):
+            go_left = X_scaled[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        # Accumulate trees in order, like sklearn's averaging
+        return np.cumsum(self.value[nodes], axis=1)[:, -1] / len(self.roots)
+
+    def max_error(self, model: Any, scaler: Optional[Any], X: np.ndarray) -> float:
+        """Largest absolute difference from sklearn's predictions on X"""
+        X_scaled = scaler.transform(X) if scaler is not None else X
+        return float(np.abs(self.predict(X) - model.predict(X_scaled)).max())
+
+
+def compile_forest(model: Any, scaler: Optional[Any] = None) -> Optional[CompiledForest]:
+    """
+    Compile a fitted forest, or None if the model is not a forest or the
+    compiled output does not match sklearn on sample rows around the
+    training distribution
+    """
+    if not hasattr(model, "estimators_") or not hasattr(model.estimators_[0], "tree_"):
+        return None
+
+    compiled = CompiledForest.from_sklearn(model, scaler)
+    rng = np.random.default_rng(0)
+    sample = compiled.mean + compiled.scale * rng.standard_normal((VERIFY_ROWS, len(compiled.mean))) * 2
+    error = compiled.max_error(model, scaler, sample)
+    if error > VERIFY_TOLERANCE:
+        print(f"Compiled forest differs from sklearn by {error}; using sklearn")
+        return None
+    return compiled
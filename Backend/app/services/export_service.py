@@ -0,0 +1,193 @@
+# backend/app/services/export_service.py
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
+
+from bson import ObjectId
+
+from ..config import settings
+
+# Exported collections: time field used for ranges/ordering and column order
+DATASETS = {
+    "crowd-reports": {
+        "collection": "crowd_reports",
+        "time_field": "created_at",
+        "columns": ["id", "station_id", "user_id", "crowd_level", "description", "created_at"]
+    },
+    "predictions": {
+        "collection": "predictions",
+        "time_field": "prediction_time",
+        "columns": [
+            "id", "station_id", "predicted_crowd_level", "confidence_score",
+            "prediction_time", "created_at", "source", "model_version"
+        ]
+    }
+}
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet"
+}
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands out what was written since the last drain"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ExportService:
+    """
+    Streams crowd reports or predictions as NDJSON, CSV or Parquet.
+
+    Rows are read from one server-side cursor ordered by (time, _id) and
+    encoded chunk by chunk, so memory stays bounded by EXPORT_CHUNK_SIZE
+    whatever the range. An interrupted export resumes by passing the id of
+    the last row received as `after_id`.
+    """
+
+    def __init__(self):
+        self.chunk_size = settings.EXPORT_CHUNK_SIZE
+
+    async def build_query(
+        self,
+        db,
+        dataset: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        station_ids: Optional[List[str]] = None,
+        after_id: Optional[str] = None
+    ) -> Optional[Dict]:
+        """Mongo filter for the export, or None if `after_id` is unknown"""
+        spec = DATASETS[dataset]
+        time_field = spec["time_field"]
+
+        query: Dict = {}
+        if station_ids:
+            query["station_id"] = {"$in": station_ids}
+        time_range = {}
+        if start is not None:
+            time_range["$gte"] = start
+        if end is not None:
+            time_range["$lt"] = end
+        if time_range:
+            query[time_field] = time_range
+
+        if after_id is not None:
+            last = await db[spec["collection"]].find_one({"_id": ObjectId(after_id)}, {time_field: 1})
+            if last is None:
+                return None
+            # Seek past the last exported row in (time, _id) order
+            query = {"$and": [query, {"$or": [
+                {time_field: {"$gt": last[time_field]}},
+                {time_field: last[time_field], "_id": {"$gt": last["_id"]}}
+            ]}]}
+        return query
+
+    def _rows(self, db, dataset: str, query: Dict) -> AsyncIterator[Dict]:
+        spec = DATASETS[dataset]
+        projection = {column: 1 for column in spec["columns"] if column != "id"}
+        return db[spec["collection"]].find(query, projection).sort(
+            [(spec["time_field"], 1), ("_id", 1)]
+        ).batch_size(self.chunk_size)
+
+    async def _chunks(self, db, dataset: str, query: Dict) -> AsyncIterator[List[Dict]]:
+        columns = DATASETS[dataset]["columns"]
+        chunk = []
+        async for doc in self._rows(db, dataset, query):
+            doc["id"] = str(doc.pop("_id"))
+            chunk.append({column: doc.get(column) for column in columns})
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    async def stream(self, db, dataset: str, query: Dict, fmt: str) -> AsyncIterator[bytes]:
+        """Encoded export body, one piece per chunk of rows"""
+        chunks = self._chunks(db, dataset, query)
+        if fmt == "ndjson":
+            encoder = self._ndjson
+        elif fmt == "csv":
+            encoder = self._csv
+        else:
+            encoder = self._parquet
+        async for data in encoder(dataset, chunks):
+            yield data
+
+    async def _ndjson(self, dataset: str, chunks) -> AsyncIterator[bytes]:
+        def default(value):
+            return value.isoformat() if isinstance(value, datetime) else str(value)
+
+        async for chunk in chunks:
+            yield "".join(json.dumps(row, default=default) + "\n" for row in chunk).encode()
+
+    async def _csv(self, dataset: str, chunks) -> AsyncIterator[bytes]:
+        columns = DATASETS[dataset]["columns"]
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns)
+        writer.writeheader()
+        async for chunk in chunks:
+            for row in chunk:
+                writer.writerow({
+                    key: value.isoformat() if isinstance(value, datetime) else value
+                    for key, value in row.items()
+                })
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    async def _parquet(self, dataset: str, chunks) -> AsyncIterator[bytes]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = self.parquet_schema(dataset)
+        sink = _ChunkSink()
+        # Each chunk becomes one row group, flushed to the client as written
+        with pq.ParquetWriter(sink, schema) as writer:
+            async for chunk in chunks:
+                writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+                yield sink.drain()
+        yield sink.drain()
+
+    def parquet_schema(self, dataset: str):
+        import pyarrow as pa
+
+        timestamp = pa.timestamp("us")
+        if dataset == "crowd-reports":
+            return pa.schema([
+                ("id", pa.string()), ("station_id", pa.string()), ("user_id", pa.string()),
+                ("crowd_level", pa.int32()), ("description", pa.string()), ("created_at", timestamp)
+            ])
+        return pa.schema([
+            ("id", pa.string()), ("station_id", pa.string()),
+            ("predicted_crowd_level", pa.float64()), ("confidence_score", pa.float64()),
+            ("prediction_time", timestamp), ("created_at", timestamp),
+            ("source", pa.string()), ("model_version", pa.string())
+        ])
+
+
+export_service = ExportService()
@@ -0,0 +1,209 @@
+# backend/app/services/feature_store.py
+from __future__ import annotations
+
+import time
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from ..config import settings
+
+if TYPE_CHECKING:
+    # NumPy is only loaded once predictions read the mirror
+    import numpy as np
+
+COLLECTION = "station_features"
+
+
+class StationFeatures:
+    """In-process copy of one station's per-day, per-hour sums and counts"""
+
+    def __init__(self, days: Optional[Dict[date, np.ndarray]] = None):
+        # day -> array of shape (2, 24): row 0 holds sums, row 1 counts
+        self.days = days or {}
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    def from_document(cls, doc: Optional[Dict]) -> StationFeatures:
+        import numpy as np
+
+        days = {}
+        for day_key, hours in ((doc or {}).get("days") or {}).items():
+            cells = np.zeros((2, 24))
+            for hour, cell in hours.items():
+                cells[0, int(hour)] = cell.get("s", 0)
+                cells[1, int(hour)] = cell.get("c", 0)
+            days[date.fromisoformat(day_key)] = cells
+        return cls(days)
+
+    def add(self, created_at: datetime, crowd_level: float) -> None:
+        import numpy as np
+
+        cells = self.days.setdefault(created_at.date(), np.zeros((2, 24)))
+        cells[0, created_at.hour] += crowd_level
+        cells[1, created_at.hour] += 1
+
+    def stale_days(self, now: datetime, window_days: int) -> List[date]:
+        first_day = (now - timedelta(days=window_days)).date()
+        return [day for day in self.days if day < first_day]
+
+    def aggregate(self, now: datetime, window_days: int) -> Tuple[np.ndarray, np.ndarray, float, float]:
+        """Hourly sums/counts over the window plus the recent-window totals"""
+        import numpy as np
+        from .features import RECENT_DAYS
+
+        first_day = (now - timedelta(days=window_days)).date()
+        recent_day = (now - timedelta(days=RECENT_DAYS)).date()
+        totals = np.zeros((2, 24))
+        recent = np.zeros((2, 24))
+        for day, cells in self.days.items():
+            if day < first_day:
+                continue
+            totals += cells
+            if day >= recent_day:
+                recent += cells
+        return totals[0], totals[1], recent[0].sum(), recent[1].sum()
+
+
+class StationFeatureStore:
+    """
+    Per-station hour-of-day aggregates kept in Mongo and mirrored in memory.
+
+    Each station document holds day buckets of per-hour sums and counts for
+    the last FEATURE_WINDOW_DAYS days, so predictions read a few precomputed
+    numbers instead of scanning raw crowd reports. Buckets are updated with
+    $inc whenever a report is recorded; the mirror is refreshed after
+    FEATURE_STORE_REFRESH_SECONDS to pick up writes from other workers.
+    """
+
+    def __init__(self):
+        self.window_days = settings.FEATURE_WINDOW_DAYS
+        self.refresh_seconds = settings.FEATURE_STORE_REFRESH_SECONDS
+        self._mirror: Dict[str, StationFeatures] = {}
+
+    def _is_fresh(self, station_id: str) -> bool:
+        entry = self._mirror.get(station_id)
+        return entry is not None and time.monotonic() - entry.loaded_at < self.refresh_seconds
+
+    async def _load(self, db, station_ids: List[str]) -> None:
+        missing = [s for s in station_ids if not self._is_fresh(s)]
+        if not missing or db is None:
+            return
+        cursor = db[COLLECTION].find({"_id": {"$in": missing}})
+        docs = {doc["_id"]: doc for doc in await cursor.to_list(length=None)}
+        for station_id in missing:
+            self._mirror[station_id] = StationFeatures.from_document(docs.get(station_id))
+
+    async def get_profile(self, db, station_id: str) -> Tuple[np.ndarray, np.ndarray, int]:
+        """Same-hour averages, recent trend and history size for one station"""
+        historical_avg, recent_trend, history_sizes = await self.get_profiles(db, [station_id])
+        return historical_avg[0], recent_trend[0], int(history_sizes[0])
+
+    async def get_profiles(
+        self,
+        db,
+        station_ids: List[str]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Profiles for many stations, loading mirror misses with one query"""
+        import numpy as np
+        from . import features
+
+        await self._load(db, station_ids)
+        now = datetime.utcnow()
+
+        hour_sums = np.zeros((len(station_ids), 24))
+        hour_counts = np.zeros((len(station_ids), 24))
+        recent_sums = np.zeros(len(station_ids))
+        recent_counts = np.zeros(len(station_ids))
+        for i, station_id in enumerate(station_ids):
+            entry = self._mirror.get(station_id)
+            if entry is None:
+                continue
+            hour_sums[i], hour_counts[i], recent_sums[i], recent_counts[i] = \
+                entry.aggregate(now, self.window_days)
+
+        historical_avg, recent_trend = features.profile_from_counts(
+            hour_sums, hour_counts, recent_sums, recent_counts
+        )
+        return historical_avg, recent_trend, hour_counts.sum(axis=1)
+
+    async def record_report(self, db, station_id: str, created_at: datetime, crowd_level: int) -> None:
+        """Fold a new crowd report into the station's day/hour bucket"""
+        update = self._station_update(station_id, [(created_at, crowd_level)])
+        if db is not None:
+            await db[COLLECTION].update_one({"_id": station_id}, update, upsert=True)
+
+    async def record_reports(self, db, reports: List[Dict]) -> None:
+        """Fold many new crowd reports in, with one bulk write for all stations"""
+        by_station: Dict[str, List[Tuple[datetime, int]]] = {}
+        for report in reports:
+            by_station.setdefault(report["station_id"], []).append((report["created_at"], report["crowd_level"]))
+
+        operations = [
+            UpdateOne({"_id": station_id}, self._station_update(station_id, station_reports), upsert=True)
+            for station_id, station_reports in by_station.items()
+        ]
+        if db is not None and operations:
+            await db[COLLECTION].bulk_write(operations, ordered=False)
+
+    def _station_update(self, station_id: str, reports: List[Tuple[datetime, int]]) -> Dict:
+        """Apply reports to the mirror and build the matching document update"""
+        entry = self._mirror.get(station_id)
+        increments: Dict[str, int] = {}
+        for created_at, crowd_level in reports:
+            if entry is not None:
+                entry.add(created_at, crowd_level)
+            bucket = f"days.{created_at.date().isoformat()}.{created_at.hour}"
+            increments[f"{bucket}.s"] = increments.get(f"{bucket}.s", 0) + crowd_level
+            increments[f"{bucket}.c"] = increments.get(f"{bucket}.c", 0) + 1
+
+        update = {
+            "$inc": increments,
+            "$set": {"updated_at": datetime.utcnow()}
+        }
+
+        # Drop buckets that slid out of the window while we are here
+        if entry is not None:
+            stale = entry.stale_days(datetime.utcnow(), self.window_days)
+            if stale:
+                update["$unset"] = {f"days.{day.isoformat()}": "" for day in stale}
+                for day in stale:
+                    del entry.days[day]
+        return update
+
+    async def rebuild(self, db) -> int:
+        """Backfill every station document from crowd_reports; returns station count"""
+        since = datetime.utcnow() - timedelta(days=self.window_days)
+        pipeline = [
+            {"$match": {"created_at": {"$gte": since}}},
+            {
+                "$group": {
+                    "_id": {
+                        "station_id": "$station_id",
+                        "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+                        "hour": {"$hour": "$created_at"}
+                    },
+                    "s": {"$sum": "$crowd_level"},
+                    "c": {"$sum": 1}
+                }
+            }
+        ]
+
+        documents: Dict[str, Dict] = {}
+        async for group in db.crowd_reports.aggregate(pipeline, allowDiskUse=True):
+            key = group["_id"]
+            doc = documents.setdefault(key["station_id"], {"_id": key["station_id"], "days": {}})
+            doc["days"].setdefault(key["day"], {})[str(key["hour"])] = {"s": group["s"], "c": group["c"]}
+
+        now = datetime.utcnow()
+        await db[COLLECTION].delete_many({"_id": {"$nin": list(documents)}})
+        for doc in documents.values():
+            doc["updated_at"] = now
+            await db[COLLECTION].replace_one({"_id": doc["_id"]}, doc, upsert=True)
+
+        self._mirror.clear()
+        return len(documents)
+
+
+feature_store = StationFeatureStore()
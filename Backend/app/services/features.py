@@ -0,0 +1,300 @@
+# backend/app/services/features.py
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional, Tuple
+
+FEATURE_COLUMNS = [
+    'hour', 'day_of_week', 'is_weekend', 'month',
+    'is_rush_hour', 'is_morning_rush', 'is_evening_rush',
+    'historical_avg', 'recent_trend'
+]
+
+DEFAULT_CROWD_LEVEL = 2.5
+RECENT_DAYS = 7
+
+
+def to_datetime64(values: Iterable) -> np.ndarray:
+    """Convert datetimes or ISO strings to a naive UTC datetime64[us] array"""
+    converted = []
+    for value in values:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        converted.append(value)
+    return np.array(converted, dtype='datetime64[us]')
+
+
+def time_feature_matrix(times: np.ndarray) -> np.ndarray:
+    """Vectorized extract_time_features: one row of time features per timestamp"""
+    times = np.asarray(times, dtype='datetime64[us]')
+    days = times.astype('datetime64[D]')
+    hour = (times.astype('datetime64[h]') - days).astype(np.int64)
+    # 1970-01-01 was a Thursday (weekday() == 3)
+    day_of_week = (days.astype(np.int64) + 3) % 7
+    month = times.astype('datetime64[M]').astype(np.int64) % 12 + 1
+
+    is_weekend = day_of_week >= 5
+    is_morning_rush = (hour >= 7) & (hour <= 10) & ~is_weekend
+    is_evening_rush = (hour >= 17) & (hour <= 20) & ~is_weekend
+    is_rush_hour = is_morning_rush | is_evening_rush
+
+    return np.column_stack([
+        hour, day_of_week, is_weekend, month,
+        is_rush_hour, is_morning_rush, is_evening_rush
+    ]).astype(np.float64)
+
+
+def profile_from_counts(
+    hour_sums: np.ndarray,
+    hour_counts: np.ndarray,
+    recent_sums: np.ndarray,
+    recent_counts: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Same-hour averages and recent trend from per-hour aggregates.
+
+    `hour_sums`/`hour_counts` have shape (..., 24) and `recent_sums`/
+    `recent_counts` the matching leading shape (...). Empty hours fall back to
+    DEFAULT_CROWD_LEVEL and empty recent/older windows to the same-hour
+    average, exactly like calculate_historical_features.
+    """
+    hour_sums = np.asarray(hour_sums, dtype=np.float64)
+    hour_counts = np.asarray(hour_counts, dtype=np.float64)
+    recent_sums = np.asarray(recent_sums, dtype=np.float64)[..., None]
+    recent_counts = np.asarray(recent_counts, dtype=np.float64)[..., None]
+
+    historical_avg = np.full(hour_sums.shape, DEFAULT_CROWD_LEVEL)
+    np.divide(hour_sums, hour_counts, out=historical_avg, where=hour_counts > 0)
+
+    older_sums = hour_sums.sum(axis=-1, keepdims=True) - recent_sums
+    older_counts = hour_counts.sum(axis=-1, keepdims=True) - recent_counts
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        recent_avg = np.where(recent_counts > 0, recent_sums / recent_counts, historical_avg)
+        older_avg = np.where(older_counts > 0, older_sums / older_counts, historical_avg)
+
+    return historical_avg, recent_avg - older_avg
+
+
+def hourly_profile(
+    times: np.ndarray,
+    levels: np.ndarray,
+    now: datetime,
+    recent_days: int = RECENT_DAYS
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Historical features for every hour of the day from one station's history.
+
+    Returns two arrays of length 24 holding the same-hour average and the
+    recent trend (last `recent_days` vs older), matching
+    calculate_historical_features for a target in that hour.
+    """
+    times = np.asarray(times, dtype='datetime64[us]')
+    levels = np.asarray(levels, dtype=np.float64)
+    hours = (times.astype('datetime64[h]') - times.astype('datetime64[D]')).astype(np.int64)
+    recent = times >= np.datetime64(now - timedelta(days=recent_days), 'us')
+
+    return profile_from_counts(
+        np.bincount(hours, weights=levels, minlength=24),
+        np.bincount(hours, minlength=24),
+        levels[recent].sum(),
+        recent.sum()
+    )
+
+
+def feature_matrix(
+    target_times: np.ndarray,
+    historical_avg: np.ndarray,
+    recent_trend: np.ndarray
+) -> np.ndarray:
+    """Full (targets x FEATURE_COLUMNS) matrix from a station's hourly profile"""
+    time_features = time_feature_matrix(target_times)
+    hours = time_features[:, 0].astype(np.int64)
+    return np.column_stack([
+        time_features,
+        historical_avg[hours],
+        recent_trend[hours]
+    ])
+
+
+def network_feature_matrix(
+    target_times: np.ndarray,
+    historical_avg: np.ndarray,
+    recent_trend: np.ndarray
+) -> np.ndarray:
+    """
+    Stacked feature matrix for many stations over a shared horizon.
+
+    `historical_avg`/`recent_trend` have shape (stations, 24); rows are laid
+    out station-major, i.e. reshape predictions to (stations, targets).
+    """
+    time_features = time_feature_matrix(target_times)
+    hours = time_features[:, 0].astype(np.int64)
+    n_stations, n_targets = historical_avg.shape[0], len(hours)
+
+    X = np.empty((n_stations, n_targets, len(FEATURE_COLUMNS)))
+    X[:, :, :time_features.shape[1]] = time_features
+    X[:, :, -2] = historical_avg[:, hours]
+    X[:, :, -1] = recent_trend[:, hours]
+    return X.reshape(n_stations * n_targets, len(FEATURE_COLUMNS))
+
+
+def rule_based_predictions(X: np.ndarray) -> np.ndarray:
+    """Rule-based crowd estimate for every row of a feature matrix"""
+    hour = X[:, 0]
+    is_weekend = X[:, 2] > 0
+    is_morning_rush = X[:, 5] > 0
+    is_evening_rush = X[:, 6] > 0
+
+    adjustment = np.where(
+        is_morning_rush, 1.0,
+        np.where(
+            is_evening_rush, 1.2,
+            np.where(is_weekend & (hour >= 11) & (hour <= 20), 0.5, 0.0)
+        )
+    )
+    return X[:, 7] + adjustment + X[:, 8] * 0.5
+
+
+def prior_group_stats(
+    groups: np.ndarray,
+    times: np.ndarray,
+    values: np.ndarray,
+    weights: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    For every row, the weighted sum of `values` and the sum of `weights` over
+    rows of the same group with a strictly earlier time.
+
+    Rows are sorted once by (group, time); ties share the prefix that ends
+    before the first of them, so a report never sees itself or reports made
+    at the same instant.
+    """
+    n = len(groups)
+    if weights is None:
+        weights = np.ones(n)
+    order = np.lexsort((times, groups))
+    g, t = groups[order], times[order]
+    w = np.asarray(weights, dtype=np.float64)[order]
+    v = np.asarray(values, dtype=np.float64)[order] * w
+
+    value_prefix = np.concatenate(([0.0], np.cumsum(v)))
+    weight_prefix = np.concatenate(([0.0], np.cumsum(w)))
+
+    positions = np.arange(n)
+    new_group = np.ones(n, dtype=bool)
+    new_group[1:] = g[1:] != g[:-1]
+    new_run = new_group.copy()
+    new_run[1:] |= t[1:] != t[:-1]
+    group_start = np.maximum.accumulate(np.where(new_group, positions, 0))
+    run_start = np.maximum.accumulate(np.where(new_run, positions, 0))
+
+    sums = np.empty(n)
+    counts = np.empty(n)
+    sums[order] = value_prefix[run_start] - value_prefix[group_start]
+    counts[order] = weight_prefix[run_start] - weight_prefix[group_start]
+    return sums, counts
+
+
+def _historical_columns(
+    hour_sums: np.ndarray,
+    hour_counts: np.ndarray,
+    total_sums: np.ndarray,
+    total_counts: np.ndarray,
+    recent_sums: np.ndarray,
+    recent_counts: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """historical_avg and recent_trend columns from per-row prior aggregates"""
+    historical_avg = np.full(len(hour_sums), DEFAULT_CROWD_LEVEL)
+    np.divide(hour_sums, hour_counts, out=historical_avg, where=hour_counts > 0)
+
+    older_sums = total_sums - recent_sums
+    older_counts = total_counts - recent_counts
+    with np.errstate(divide='ignore', invalid='ignore'):
+        recent_avg = np.where(recent_counts > 0, recent_sums / recent_counts, historical_avg)
+        older_avg = np.where(older_counts > 0, older_sums / older_counts, historical_avg)
+
+    return historical_avg, recent_avg - older_avg
+
+
+def build_training_features(
+    station_codes: np.ndarray,
+    times: np.ndarray,
+    levels: np.ndarray,
+    now: datetime,
+    recent_days: int = RECENT_DAYS
+) -> np.ndarray:
+    """
+    Training matrix where each report's historical features are computed from
+    the reports of its station made strictly before it, in O(n log n).
+
+    Produces the same rows as running calculate_historical_features on each
+    report's prior history, with the recent window anchored at `now`.
+    """
+    return StreamingFeatureBuilder(now, recent_days).transform(station_codes, times, levels)
+
+
+class StreamingFeatureBuilder:
+    """
+    build_training_features over a stream of batches.
+
+    Batches must arrive ordered by station and, within a station, by time,
+    and must not split reports of one station made at the same instant. The
+    running totals of the last station seen are carried into the next batch,
+    so memory stays bounded by the batch size.
+    """
+
+    def __init__(self, now: datetime, recent_days: int = RECENT_DAYS):
+        self.recent_cutoff = np.datetime64(now - timedelta(days=recent_days), 'us')
+        self._station = None
+        self._hour_sums = np.zeros(24)
+        self._hour_counts = np.zeros(24)
+        # sum, count, recent sum, recent count
+        self._totals = np.zeros(4)
+
+    def transform(self, station_codes: np.ndarray, times: np.ndarray, levels: np.ndarray) -> np.ndarray:
+        times = np.asarray(times, dtype='datetime64[us]')
+        station_codes = np.asarray(station_codes, dtype=np.int64)
+        levels = np.asarray(levels, dtype=np.float64)
+        if len(levels) == 0:
+            return np.empty((0, len(FEATURE_COLUMNS)))
+        ticks = times.astype(np.int64)
+
+        time_features = time_feature_matrix(times)
+        hours = time_features[:, 0].astype(np.int64)
+        recent = times >= self.recent_cutoff
+
+        hour_sums, hour_counts = prior_group_stats(station_codes * 24 + hours, ticks, levels)
+        total_sums, total_counts = prior_group_stats(station_codes, ticks, levels)
+        recent_sums, recent_counts = prior_group_stats(station_codes, ticks, levels, recent)
+
+        # Add the history carried over from the previous batch
+        carried = station_codes == self._station
+        if carried.any():
+            hour_sums[carried] += self._hour_sums[hours[carried]]
+            hour_counts[carried] += self._hour_counts[hours[carried]]
+            total_sums[carried] += self._totals[0]
+            total_counts[carried] += self._totals[1]
+            recent_sums[carried] += self._totals[2]
+            recent_counts[carried] += self._totals[3]
+
+        # Carry the last station of this batch forward
+        last = station_codes[-1]
+        if last != self._station:
+            self._station = last
+            self._hour_sums = np.zeros(24)
+            self._hour_counts = np.zeros(24)
+            self._totals = np.zeros(4)
+        mask = station_codes == last
+        self._hour_sums += np.bincount(hours[mask], weights=levels[mask], minlength=24)
+        self._hour_counts += np.bincount(hours[mask], minlength=24)
+        self._totals += [
+            levels[mask].sum(), mask.sum(),
+            levels[mask & recent].sum(), (mask & recent).sum()
+        ]
+
+        historical_avg, recent_trend = _historical_columns(
+            hour_sums, hour_counts, total_sums, total_counts, recent_sums, recent_counts
+        )
+        return np.column_stack([time_features, historical_avg, recent_trend])
@@ -0,0 +1,304 @@
+# backend/app/services/forecast_materializer.py
+import asyncio
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+
+from ..config import settings
+from ..database import get_database
+from ..utils.pagination import seek_filter, sort_keys
+from .feature_store import feature_store
+from .live_state import live_state
+from .prediction_service import prediction_service
+from .station_cache import station_cache
+
+SOURCE = "materialized"
+STATIONS_PER_BATCH = 500
+LEASE_COLLECTION = "leases"
+LEASE_ID = "forecast_materializer"
+LEASE_RELEASE_TIMEOUT_SECONDS = 2
+DUPLICATE_KEY = 11000
+
+
+def hour_slot(value: datetime) -> datetime:
+    """Start of the hour containing `value`; forecasts are constant within it"""
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+class ForecastMaterializer:
+    """
+    Precomputes hourly forecasts for every station into `predictions`.
+
+    Every FORECAST_REFRESH_SECONDS the next FORECAST_HORIZON_HOURS hour
+    slots of all stations are predicted with one model call per batch of
+    stations and upserted by (station_id, prediction_time), tagged with
+    source="materialized"; a partial unique index (init_db.py) keeps one row
+    per slot. Only the worker holding the lease document in `leases`
+    refreshes on schedule; the lease lasts two refresh periods so another
+    worker takes over if the holder stops. The hourly and station endpoints
+    read those rows and only run live inference when a slot is missing, was
+    last updated more than FORECAST_MAX_AGE_SECONDS ago, or was predicted by
+    another global model version than the one this worker serves. The lease
+    holder refreshes early once it picks up a new global model; a station
+    trained with its own model is re-materialized by the training job.
+    """
+
+    def __init__(self):
+        self.horizon_hours = settings.FORECAST_HORIZON_HOURS
+        self.refresh_seconds = settings.FORECAST_REFRESH_SECONDS
+        self.max_age = timedelta(seconds=settings.FORECAST_MAX_AGE_SECONDS)
+        self.retention = timedelta(days=settings.FORECAST_RETENTION_DAYS)
+        self.lease = timedelta(seconds=2 * self.refresh_seconds)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.check_seconds = min(settings.MODEL_RELOAD_CHECK_SECONDS, self.refresh_seconds)
+        self.last_run: Optional[Dict] = None
+        self._model_version: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            db = get_database()
+            if db is not None:
+                # Let another worker take over without waiting for expiry; if
+                # Mongo is unreachable the lease simply expires
+                try:
+                    await asyncio.wait_for(
+                        db[LEASE_COLLECTION].delete_one({"_id": LEASE_ID, "owner": self.owner}),
+                        timeout=LEASE_RELEASE_TIMEOUT_SECONDS
+                    )
+                except (asyncio.TimeoutError, PyMongoError) as e:
+                    print(f"Forecast lease release skipped: {e!r}")
+
+    async def _acquire_lease(self, db) -> bool:
+        """Take or renew the materialization lease; False if another worker holds it"""
+        now = datetime.utcnow()
+        try:
+            await db[LEASE_COLLECTION].update_one(
+                {"_id": LEASE_ID, "$or": [{"owner": self.owner}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"owner": self.owner, "expires_at": now + self.lease}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # The lease exists and is held by someone else, so the upsert tried to insert
+            return False
+        return True
+
+    async def _loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_run = 0.0
+        while True:
+            try:
+                # Loads the global model, or checks for a newer one, off the event loop
+                await loop.run_in_executor(None, prediction_service._get_bundle)
+                model_changed = prediction_service.model_version != self._model_version
+                db = get_database()
+                if db is not None and (model_changed or time.monotonic() >= next_run) \
+                        and await self._acquire_lease(db):
+                    await self.run_once(db)
+                    next_run = time.monotonic() + self.refresh_seconds
+            except Exception as e:
+                print(f"Forecast materialization failed: {e}")
+            await asyncio.sleep(self.check_seconds)
+
+    async def run_once(self, db) -> int:
+        """Materialize forecasts for all stations and drop expired ones; returns rows written"""
+        started = datetime.utcnow()
+        self._model_version = prediction_service.model_version
+        cursor = db.stations.find({}, {"_id": 1})
+        station_ids = [str(s["_id"]) for s in await cursor.to_list(length=None)]
+
+        written = await self.materialize(db, station_ids)
+
+        await db.predictions.delete_many({
+            "source": SOURCE,
+            "prediction_time": {"$lt": hour_slot(started) - self.retention}
+        })
+
+        self.last_run = {
+            "started_at": started,
+            "finished_at": datetime.utcnow(),
+            "stations": len(station_ids),
+            "rows": written
+        }
+        return written
+
+    async def materialize(self, db, station_ids: List[str]) -> int:
+        """Predict and upsert the forecast horizon of the given stations; returns rows written"""
+        first_slot = hour_slot(datetime.utcnow())
+        # One extra slot so the horizon stays covered until the next refresh
+        target_times = [first_slot + timedelta(hours=i) for i in range(self.horizon_hours + 1)]
+
+        loop = asyncio.get_running_loop()
+        written = 0
+        for i in range(0, len(station_ids), STATIONS_PER_BATCH):
+            batch = station_ids[i:i + STATIONS_PER_BATCH]
+            historical_avg, recent_trend, history_sizes = await feature_store.get_profiles(db, batch)
+            # Model inference runs off the event loop
+            X, predicted, confidence = await loop.run_in_executor(
+                None,
+                prediction_service.predict_network,
+                target_times, historical_avg, recent_trend, history_sizes, batch
+            )
+
+            now = datetime.utcnow()
+            operations = []
+            for s, station_id in enumerate(batch):
+                for h, target_time in enumerate(target_times):
+                    payload = prediction_service._format_prediction(
+                        float(predicted[s, h]),
+                        float(confidence[s]),
+                        X[s * len(target_times) + h],
+                        target_time
+                    )
+                    operations.append(UpdateOne(
+                        {"station_id": station_id, "prediction_time": target_time, "source": SOURCE},
+                        {
+                            "$set": {
+                                "predicted_crowd_level": payload["predicted_crowd_level"],
+                                "confidence_score": payload["confidence_score"],
+                                "factors": payload["factors"],
+                                "model_version": prediction_service.model_version,
+                                "updated_at": now
+                            },
+                            "$setOnInsert": {"created_at": now}
+                        },
+                        upsert=True
+                    ))
+            if operations:
+                await self._upsert(db, operations)
+                written += len(operations)
+        return written
+
+    async def _upsert(self, db, operations: List[UpdateOne]) -> None:
+        try:
+            await db.predictions.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if not errors or any(error["code"] != DUPLICATE_KEY for error in errors):
+                raise
+            # Another worker inserted the same slots concurrently; now they update
+            await db.predictions.bulk_write([operations[error["index"]] for error in errors], ordered=False)
+
+    def _fresh_filter(self, station_id: str) -> Dict:
+        return {
+            "station_id": station_id,
+            "source": SOURCE,
+            "model_version": prediction_service.model_version,
+            "updated_at": {"$gte": datetime.utcnow() - self.max_age}
+        }
+
+    async def get_hourly(self, db, station_id: str, hours_ahead: int) -> Optional[List[Dict]]:
+        """
+        Materialized equivalent of get_hourly_predictions, or None if any
+        requested hour is missing or stale
+        """
+        current_time = datetime.utcnow()
+        target_times = [current_time + timedelta(hours=i) for i in range(hours_ahead)]
+        if not target_times:
+            return []
+
+        query = self._fresh_filter(station_id)
+        query["prediction_time"] = {
+            "$gte": hour_slot(target_times[0]),
+            "$lte": hour_slot(target_times[-1])
+        }
+        cursor = db.predictions.find(query)
+        rows = {doc["prediction_time"]: doc for doc in await cursor.to_list(length=None)}
+
+        # Same live factors as the inference path, which rows cannot store
+        live_factors = live_state.factors(station_id)
+        predictions = []
+        for target_time in target_times:
+            row = rows.get(hour_slot(target_time))
+            if row is None:
+                return None
+            predictions.append({
+                "predicted_crowd_level": row["predicted_crowd_level"],
+                "confidence_score": row["confidence_score"],
+                "factors": {**(row.get("factors") or {}), **live_factors},
+                "prediction_time": target_time.isoformat()
+            })
+        return predictions
+
+    async def get_slot(self, db, station_ids: List[str], target_time: datetime) -> Dict[str, Dict]:
+        """Fresh materialized rows of many stations for the hour slot of `target_time`"""
+        cursor = db.predictions.find({
+            "station_id": {"$in": station_ids},
+            "source": SOURCE,
+            "prediction_time": hour_slot(target_time),
+            "model_version": prediction_service.model_version,
+            "updated_at": {"$gte": datetime.utcnow() - self.max_age}
+        })
+        return {row["station_id"]: row for row in await cursor.to_list(length=None)}
+
+    async def predict_slot(self, db, station_ids: List[str], target_time: datetime) -> Dict[str, float]:
+        """
+        Live predicted levels of many stations at `target_time` with one
+        model call, for stations missing from get_slot
+        """
+        historical_avg, recent_trend, history_sizes = await feature_store.get_profiles(db, station_ids)
+        loop = asyncio.get_running_loop()
+        _, predicted, _ = await loop.run_in_executor(
+            None,
+            prediction_service.predict_network,
+            [target_time], historical_avg, recent_trend, history_sizes, station_ids
+        )
+        return {station_id: round(float(predicted[s, 0]), 2) for s, station_id in enumerate(station_ids)}
+
+    async def get_upcoming(
+        self,
+        db,
+        station_id: str,
+        limit: int,
+        after: Optional[Tuple[datetime, ObjectId]] = None
+    ) -> List[Dict]:
+        """
+        Upcoming prediction rows of a station in (prediction_time, _id)
+        order, starting past `after` if given: fresh materialized forecasts
+        next to the predictions stored by POST /predict. The first page
+        materializes the station on the spot when it has no fresh forecast.
+        """
+        current_slot = hour_slot(datetime.utcnow())
+        materialized = self._fresh_filter(station_id)
+        materialized["prediction_time"] = {"$gte": current_slot}
+        if after is None and await station_cache.get(db, station_id):
+            if await db.predictions.find_one(materialized, {"_id": 1}) is None:
+                # Live fallback: predict this station now and keep the result
+                await self.materialize(db, [station_id])
+
+        query = {
+            "station_id": station_id,
+            "prediction_time": {"$gte": current_slot},
+            "$or": [
+                {
+                    "source": SOURCE,
+                    "model_version": materialized["model_version"],
+                    "updated_at": materialized["updated_at"]
+                },
+                {"source": {"$exists": False}}
+            ]
+        }
+        if after is not None:
+            query = {"$and": [query, seek_filter(after, "prediction_time")]}
+        cursor = db.predictions.find(query).sort(sort_keys("prediction_time")).limit(limit)
+        return await cursor.to_list(length=limit)
+
+
+forecast_materializer = ForecastMaterializer()
@@ -0,0 +1,181 @@
+# backend/app/services/latency.py
+import bisect
+import json
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from ..config import settings
+
+logger = logging.getLogger("app.latency")
+
+# Histogram bucket upper bounds in ms: 0.01 ms to ~100 s, 25% apart
+BUCKET_BOUNDS_MS: List[float] = []
+_bound = 0.01
+while _bound < 100_000:
+    BUCKET_BOUNDS_MS.append(_bound)
+    _bound *= 1.25
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+class LatencyHistogram:
+    """Fixed log-bucket histogram; percentiles are bucket upper bounds"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        rank = q / 100 * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if bucket_count and seen >= rank:
+                bound = BUCKET_BOUNDS_MS[i] if i < len(BUCKET_BOUNDS_MS) else self.max_ms
+                return min(bound, self.max_ms)
+        return 0.0
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            **{f"p{q}_ms": round(self.percentile(q), 3) for q in PERCENTILES}
+        }
+
+
+class RequestTrace:
+    """Stage timings of one request and the prediction path it took"""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.path: Optional[str] = None
+        self.stages: Dict[str, float] = {}
+
+
+class _Stage:
+    __slots__ = ("trace", "name", "start")
+
+    def __init__(self, trace: RequestTrace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        elapsed = (time.perf_counter() - self.start) * 1000
+        self.trace.stages[self.name] = self.trace.stages.get(self.name, 0.0) + elapsed
+
+
+class _NoOp:
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP = _NoOp()
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("latency_trace", default=None)
+
+
+class _Request:
+    __slots__ = ("recorder", "trace", "token", "start")
+
+    def __init__(self, recorder: "LatencyRecorder", endpoint: str):
+        self.recorder = recorder
+        self.trace = RequestTrace(endpoint)
+
+    def __enter__(self) -> RequestTrace:
+        self.token = _current_trace.set(self.trace)
+        self.start = time.perf_counter()
+        return self.trace
+
+    def __exit__(self, *exc_info):
+        self.trace.stages["total"] = (time.perf_counter() - self.start) * 1000
+        _current_trace.reset(self.token)
+        self.recorder._finish(self.trace)
+        return False
+
+
+class LatencyRecorder:
+    """
+    Per-stage latency histograms for the prediction hot path.
+
+    A request opened with `request(endpoint)` collects `stage(name)` timings
+    and a path tag (model, rule_based, fallback, cached, materialized) in a
+    context variable; when it ends each stage is added to the histogram of
+    (endpoint, path, stage) and, if LATENCY_LOG_ENABLED, one JSON log line is
+    written. With LATENCY_METRICS_ENABLED off every call returns a shared
+    no-op context manager.
+    """
+
+    def __init__(self):
+        self.enabled = settings.LATENCY_METRICS_ENABLED
+        self.log_enabled = settings.LATENCY_LOG_ENABLED
+        self._histograms: Dict[Tuple[str, str, str], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def request(self, endpoint: str):
+        if not self.enabled:
+            return _NOOP
+        return _Request(self, endpoint)
+
+    def stage(self, name: str):
+        trace = _current_trace.get() if self.enabled else None
+        if trace is None:
+            return _NOOP
+        return _Stage(trace, name)
+
+    def set_path(self, path: str) -> None:
+        """Tag the current request with the prediction path that served it"""
+        trace = _current_trace.get() if self.enabled else None
+        if trace is not None:
+            trace.path = path
+
+    def _finish(self, trace: RequestTrace) -> None:
+        path = trace.path or "none"
+        with self._lock:
+            for stage, ms in trace.stages.items():
+                key = (trace.endpoint, path, stage)
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = LatencyHistogram()
+                histogram.record(ms)
+
+        if self.log_enabled:
+            logger.info(json.dumps({
+                "event": "request_latency",
+                "endpoint": trace.endpoint,
+                "path": path,
+                "stages_ms": {stage: round(ms, 3) for stage, ms in trace.stages.items()}
+            }))
+
+    def snapshot(self) -> Dict:
+        """Percentiles per endpoint, path and stage"""
+        result: Dict[str, Dict] = {}
+        with self._lock:
+            for (endpoint, path, stage), histogram in sorted(self._histograms.items()):
+                result.setdefault(endpoint, {}).setdefault(path, {})[stage] = histogram.summary()
+        return {"enabled": self.enabled, "endpoints": result}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+latency = LatencyRecorder()
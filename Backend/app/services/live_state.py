@@ -0,0 +1,220 @@
+# backend/app/services/live_state.py
+import asyncio
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from ..config import settings
+from ..database import get_database
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_seconds(value: datetime) -> float:
+    return (value - EPOCH).total_seconds()
+
+
+class StationWindow:
+    """
+    Ring buffer of one station's most recent reports.
+
+    Timestamps and levels live in flat arrays next to the running total of
+    levels recorded before each entry, so the sum over any suffix of the
+    buffer is one subtraction and a window lookup is a binary search.
+    Arrays grow on demand up to `capacity`, then the oldest entry is
+    overwritten.
+    """
+
+    __slots__ = ("capacity", "times", "levels", "prefix", "start", "total")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.times = array("d")
+        self.levels = array("b")
+        self.prefix = array("d")
+        self.start = 0
+        self.total = 0.0
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def _slot(self, i: int) -> int:
+        return (self.start + i) % len(self.times)
+
+    def add(self, timestamp: float, crowd_level: int) -> None:
+        if self.times:
+            # Late reports are filed as the newest so the buffer stays sorted
+            timestamp = max(timestamp, self.times[self._slot(len(self.times) - 1)])
+        if len(self.times) < self.capacity:
+            self.times.append(timestamp)
+            self.levels.append(crowd_level)
+            self.prefix.append(self.total)
+        else:
+            slot = self.start
+            self.times[slot] = timestamp
+            self.levels[slot] = crowd_level
+            self.prefix[slot] = self.total
+            self.start = (slot + 1) % self.capacity
+        self.total += crowd_level
+
+    def since(self, timestamp: float):
+        """(count, sum) of the buffered reports at or after `timestamp`"""
+        low, high = 0, len(self.times)
+        while low < high:
+            mid = (low + high) // 2
+            if self.times[self._slot(mid)] < timestamp:
+                low = mid + 1
+            else:
+                high = mid
+        count = len(self.times) - low
+        if not count:
+            return 0, 0.0
+        return count, self.total - self.prefix[self._slot(low)]
+
+
+class LiveState:
+    """
+    In-process sliding-window view of the latest crowd reports per station.
+
+    Every stored report is appended to its station's StationWindow, so the
+    current level (average over LIVE_STATE_WINDOW_MINUTES), shorter-window
+    averages and report rates are answered from memory. The windows are
+    seeded from crowd_reports at startup and re-seeded every
+    LIVE_STATE_RESYNC_SECONDS to pick up reports stored by other workers;
+    until the first seed completes `ready` is False and callers fall back to
+    the hourly rollups. Each station keeps at most LIVE_STATE_CAPACITY
+    reports, which bounds windows at very busy stations to the latest ones.
+    """
+
+    def __init__(self):
+        self.enabled = settings.LIVE_STATE_ENABLED
+        self.window_minutes = settings.LIVE_STATE_WINDOW_MINUTES
+        self.capacity = settings.LIVE_STATE_CAPACITY
+        self.resync_seconds = settings.LIVE_STATE_RESYNC_SECONDS
+        self.ready = False
+        self._windows: Dict[str, StationWindow] = {}
+        # Reports recorded while a seed query runs, replayed on top of it
+        self._pending: Optional[List] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                db = get_database()
+                if db is not None:
+                    await self.seed(db)
+            except Exception as e:
+                print(f"Live state seed failed: {e}")
+            if self.ready and self.resync_seconds <= 0:
+                return
+            await asyncio.sleep(self.resync_seconds if self.ready else 5)
+
+    async def seed(self, db) -> int:
+        """Rebuild the windows from the reports of the last window; returns their number"""
+        self._pending = []
+        try:
+            since = datetime.utcnow() - timedelta(minutes=self.window_minutes)
+            cursor = db.crowd_reports.find(
+                {"created_at": {"$gte": since}},
+                {"station_id": 1, "created_at": 1, "crowd_level": 1}
+            ).sort("created_at", 1)
+            reports = await cursor.to_list(length=None)
+        except Exception:
+            self._pending = None
+            raise
+
+        pending, self._pending = self._pending, None
+        pending_ids: Set = {report_id for _, _, _, report_id in pending if report_id is not None}
+        windows: Dict[str, StationWindow] = {}
+        for report in reports:
+            if report["_id"] in pending_ids:
+                continue
+            self._add(windows, report["station_id"], to_seconds(report["created_at"]), report["crowd_level"])
+        for station_id, timestamp, crowd_level, _ in pending:
+            self._add(windows, station_id, timestamp, crowd_level)
+
+        self._windows = windows
+        self.ready = True
+        return len(reports)
+
+    def _add(self, windows: Dict[str, StationWindow], station_id: str, timestamp: float, crowd_level: int) -> None:
+        window = windows.get(station_id)
+        if window is None:
+            window = windows[station_id] = StationWindow(self.capacity)
+        window.add(timestamp, crowd_level)
+
+    def record(self, station_id: str, created_at: datetime, crowd_level: int, report_id=None) -> None:
+        """Append a newly stored report to its station's window"""
+        if not self.enabled:
+            return
+        timestamp = to_seconds(created_at)
+        if self._pending is not None:
+            self._pending.append((station_id, timestamp, crowd_level, report_id))
+        self._add(self._windows, station_id, timestamp, crowd_level)
+
+    def average(self, station_id: str, minutes: Optional[float] = None, now: Optional[datetime] = None) -> Optional[float]:
+        """Average level of the reports in the last `minutes` (default: the live window)"""
+        window = self._windows.get(station_id)
+        if window is None:
+            return None
+        minutes = self.window_minutes if minutes is None else minutes
+        count, total = window.since(to_seconds(now or datetime.utcnow()) - minutes * 60)
+        return total / count if count else None
+
+    def current_level(self, station_id: str, now: Optional[datetime] = None) -> Optional[float]:
+        return self.average(station_id, now=now)
+
+    def current_levels(self, station_ids: List[str], now: Optional[datetime] = None) -> Dict[str, float]:
+        """Current levels of the stations that have reports in the window"""
+        now = now or datetime.utcnow()
+        levels = {}
+        for station_id in station_ids:
+            level = self.average(station_id, now=now)
+            if level is not None:
+                levels[station_id] = level
+        return levels
+
+    def report_rate(self, station_id: str, minutes: Optional[float] = None, now: Optional[datetime] = None) -> float:
+        """Reports per hour over the last `minutes` (default: the live window)"""
+        window = self._windows.get(station_id)
+        if window is None:
+            return 0.0
+        minutes = self.window_minutes if minutes is None else minutes
+        count, _ = window.since(to_seconds(now or datetime.utcnow()) - minutes * 60)
+        return count * 60 / minutes
+
+    def factors(self, station_id: str) -> Dict:
+        """Live prediction factors of a station, empty before the first seed or without reports"""
+        current_level = self.current_level(station_id) if self.ready else None
+        if current_level is None:
+            return {}
+        return {
+            "current_crowd_level": round(current_level, 2),
+            "reports_per_hour": round(self.report_rate(station_id), 2)
+        }
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "ready": self.ready,
+            "stations": len(self._windows),
+            "buffered_reports": sum(len(window) for window in self._windows.values()),
+            "window_minutes": self.window_minutes,
+            "capacity": self.capacity
+        }
+
+
+live_state = LiveState()
@@ -0,0 +1,153 @@
+# backend/app/services/model_registry.py
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Set, Tuple
+
+from ..config import settings
+from .model_store import model_store
+from .prediction_cache import prediction_cache
+
+LOAD_WORKERS = 2
+
+
+def station_namespace(station_id: str) -> str:
+    return f"station-{station_id}"
+
+
+class StationModelRegistry:
+    """
+    Per-station models loaded on demand into a memory-bounded LRU.
+
+    Each station model is a versioned artifact in its own model_store
+    namespace. Loaded models are kept in least-recently-used order and
+    evicted once their resident sizes exceed MODEL_REGISTRY_MEMORY_MB, so
+    many specialized models can exist without all being resident. With
+    INFERENCE_ENGINE="compiled" an entry holds only the CompiledForest
+    predictions run on, charged by the bytes of its node arrays; otherwise
+    an entry is charged its artifact size.
+
+    Lookups never touch the disk: the store is asked for a station's current
+    version in the background once its entry (or the note that it has no
+    model) is older than MODEL_RELOAD_CHECK_SECONDS, which is also how
+    versions saved by other workers are picked up. Until that load finishes
+    the previous entry is served, or None so the global model is used.
+    """
+
+    def __init__(self, store=model_store, memory_budget_mb: Optional[int] = None):
+        self.store = store
+        self.memory_budget = (memory_budget_mb or settings.MODEL_REGISTRY_MEMORY_MB) * 1024 * 1024
+        self.check_seconds = settings.MODEL_RELOAD_CHECK_SECONDS
+
+        # station_id -> {"bundle", "version", "size", "checked_at"}
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._missing: Dict[str, float] = {}
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+        self._loader = ThreadPoolExecutor(max_workers=LOAD_WORKERS, thread_name_prefix="station-model-load")
+        self._counters = dict.fromkeys(("hits", "loads", "evictions"), 0)
+
+    @property
+    def memory_used(self) -> int:
+        return sum(entry["size"] for entry in self._entries.values())
+
+    def get(self, station_id: str) -> Optional[Tuple[Any, Any]]:
+        """(model, scaler) of a station, or None if it has no model of its own (yet)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(station_id)
+            if entry is not None:
+                self._entries.move_to_end(station_id)
+                self._counters["hits"] += 1
+                due = now - entry["checked_at"] >= self.check_seconds
+            else:
+                missing_since = self._missing.get(station_id)
+                due = missing_since is None or now - missing_since >= self.check_seconds
+            if due and station_id not in self._pending:
+                self._pending.add(station_id)
+                self._loader.submit(self._refresh, station_id)
+            return entry["bundle"] if entry is not None else None
+
+    def _refresh(self, station_id: str) -> None:
+        """Check a station's current version and load it if it changed"""
+        namespace = station_namespace(station_id)
+        try:
+            version = self.store.current_version(namespace)
+            with self._lock:
+                entry = self._entries.get(station_id)
+                if version is None:
+                    self._entries.pop(station_id, None)
+                    self._missing[station_id] = time.monotonic()
+                    return
+                if entry is not None and entry["version"] == version:
+                    entry["checked_at"] = time.monotonic()
+                    return
+
+            model, scaler, _ = self.store.load(namespace, version)
+            bundle, size = self._resident(namespace, version, model, scaler)
+            with self._lock:
+                self._counters["loads"] += 1
+                self._put(station_id, bundle, version, size)
+            # Predictions made with the global model meanwhile are outdated
+            prediction_cache.invalidate_station(station_id)
+        except Exception as e:
+            print(f"Station model load error ({station_id}): {e}")
+            with self._lock:
+                entry = self._entries.get(station_id)
+                if entry is not None:
+                    entry["checked_at"] = time.monotonic()
+                else:
+                    self._missing[station_id] = time.monotonic()
+        finally:
+            with self._lock:
+                self._pending.discard(station_id)
+
+    def save(self, station_id: str, model: Any, scaler: Any, metrics: Optional[Dict] = None) -> Dict:
+        """Store a new version of a station's model and make it resident"""
+        namespace = station_namespace(station_id)
+        metadata = self.store.save(model, scaler, metrics, namespace=namespace)
+        bundle, size = self._resident(namespace, metadata["version"], model, scaler)
+        with self._lock:
+            self._put(station_id, bundle, metadata["version"], size)
+        return metadata
+
+    def _resident(self, namespace: str, version: str, model: Any, scaler: Any) -> Tuple[Tuple[Any, Any], int]:
+        """The bundle an entry keeps in memory and the bytes charged for it"""
+        if settings.INFERENCE_ENGINE == "compiled":
+            from .compiled_forest import CompiledForest, compile_forest
+            forest = model if isinstance(model, CompiledForest) else compile_forest(model, scaler)
+            if forest is not None:
+                # The sklearn forest is dropped; only the node arrays stay resident
+                return (forest, scaler), forest.nbytes
+        return (model, scaler), self.store.artifact_size(namespace, version)
+
+    def _put(self, station_id: str, bundle: Tuple[Any, Any], version: str, size: int) -> None:
+        self._missing.pop(station_id, None)
+        self._entries[station_id] = {
+            "bundle": bundle,
+            "version": version,
+            "size": size,
+            "checked_at": time.monotonic()
+        }
+        self._entries.move_to_end(station_id)
+
+        # Evict least recently used models, always keeping the newest one
+        while len(self._entries) > 1 and self.memory_used > self.memory_budget:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self._counters,
+                "loaded": len(self._entries),
+                "memory_used_bytes": self.memory_used,
+                "memory_budget_bytes": self.memory_budget,
+                "stations": {
+                    station_id: entry["version"] for station_id, entry in self._entries.items()
+                }
+            }
+
+
+model_registry = StationModelRegistry()
@@ -0,0 +1,196 @@
+# backend/app/services/model_store.py
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from ..config import settings
+
+FORMAT_VERSION = 1
+MODEL_FILE = "model.joblib"
+SCALER_FILE = "scaler.joblib"
+METADATA_FILE = "metadata.json"
+CURRENT_FILE = "CURRENT"
+GLOBAL_NAMESPACE = "global"
+FOREST_DIR = "forest"
+FOREST_ARRAYS = ("feature", "threshold", "left", "right", "value", "roots", "mean", "scale")
+
+
+def file_checksum(path: str) -> str:
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelStore:
+    """
+    Versioned model artifacts on disk.
+
+    Layout: <MODEL_DIR>/<namespace>/<version>/{model.joblib, scaler.joblib,
+    metadata.json} with a CURRENT file per namespace naming the active
+    version. Versions are written to a temporary directory and renamed into
+    place, and CURRENT is replaced atomically, so readers never see a partial
+    artifact.
+
+    Random forests are also stored as the flat node arrays of their
+    CompiledForest (forest/*.npy). With INFERENCE_ENGINE="compiled" those
+    arrays are loaded instead of the pickled model, memory-mapped read-only
+    when MODEL_MMAP is set, so every worker serving the same version shares
+    one copy of the forest through the page cache.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or settings.MODEL_DIR
+
+    def _namespace_dir(self, namespace: str) -> str:
+        return os.path.join(self.root, namespace)
+
+    def current_version(self, namespace: str = GLOBAL_NAMESPACE) -> Optional[str]:
+        """Name of the active version, or None if nothing was saved yet"""
+        try:
+            with open(os.path.join(self._namespace_dir(namespace), CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def save(
+        self,
+        model: Any,
+        scaler: Any,
+        metrics: Optional[Dict] = None,
+        namespace: str = GLOBAL_NAMESPACE
+    ) -> Dict:
+        """Write a new version and make it current; returns its metadata"""
+        import joblib
+        from .features import FEATURE_COLUMNS
+
+        namespace_dir = self._namespace_dir(namespace)
+        os.makedirs(namespace_dir, exist_ok=True)
+
+        version = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        staging_dir = os.path.join(namespace_dir, f".{version}.tmp")
+        os.makedirs(staging_dir)
+        try:
+            joblib.dump(model, os.path.join(staging_dir, MODEL_FILE))
+            joblib.dump(scaler, os.path.join(staging_dir, SCALER_FILE))
+            forest = self._save_forest(staging_dir, model, scaler)
+            metadata = {
+                "format_version": FORMAT_VERSION,
+                "version": version,
+                "namespace": namespace,
+                "created_at": datetime.utcnow().isoformat(),
+                "feature_columns": list(FEATURE_COLUMNS),
+                "metrics": metrics or {},
+                "forest": forest,
+                "checksums": {
+                    name: file_checksum(os.path.join(staging_dir, name))
+                    for name in self._artifact_files(forest)
+                }
+            }
+            with open(os.path.join(staging_dir, METADATA_FILE), 'w') as f:
+                json.dump(metadata, f, indent=2)
+            os.rename(staging_dir, os.path.join(namespace_dir, version))
+        except Exception:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+
+        pointer = os.path.join(namespace_dir, f"{CURRENT_FILE}.tmp")
+        with open(pointer, 'w') as f:
+            f.write(version)
+        os.replace(pointer, os.path.join(namespace_dir, CURRENT_FILE))
+
+        self._prune(namespace_dir, keep=settings.MODEL_KEEP_VERSIONS)
+        return metadata
+
+    def _save_forest(self, staging_dir: str, model: Any, scaler: Any) -> Optional[Dict]:
+        """Write the compiled node arrays of a forest; None for other models"""
+        import numpy as np
+        from .compiled_forest import compile_forest
+
+        forest = compile_forest(model, scaler)
+        if forest is None:
+            return None
+        os.makedirs(os.path.join(staging_dir, FOREST_DIR))
+        for name in FOREST_ARRAYS:
+            np.save(os.path.join(staging_dir, FOREST_DIR, f"{name}.npy"), getattr(forest, name))
+        return {"depth": int(forest.depth)}
+
+    def _artifact_files(self, forest: Optional[Dict]):
+        files = [MODEL_FILE, SCALER_FILE]
+        if forest is not None:
+            files += [os.path.join(FOREST_DIR, f"{name}.npy") for name in FOREST_ARRAYS]
+        return files
+
+    def artifact_size(self, namespace: str, version: str) -> int:
+        """Bytes on disk of the files a version is served from"""
+        version_dir = os.path.join(self._namespace_dir(namespace), version)
+        forest_dir = os.path.join(version_dir, FOREST_DIR)
+        if settings.INFERENCE_ENGINE == "compiled" and os.path.isdir(forest_dir):
+            names = [os.path.join(FOREST_DIR, f"{name}.npy") for name in FOREST_ARRAYS] + [SCALER_FILE]
+        else:
+            names = [MODEL_FILE, SCALER_FILE]
+        return sum(os.path.getsize(os.path.join(version_dir, name)) for name in names)
+
+    def _prune(self, namespace_dir: str, keep: int) -> None:
+        """Remove all but the newest `keep` versions of a namespace"""
+        versions = sorted(
+            name for name in os.listdir(namespace_dir)
+            if not name.startswith('.') and name != CURRENT_FILE
+        )
+        for version in versions[:-keep] if keep > 0 else []:
+            shutil.rmtree(os.path.join(namespace_dir, version), ignore_errors=True)
+
+    def load(
+        self,
+        namespace: str = GLOBAL_NAMESPACE,
+        version: Optional[str] = None
+    ) -> Optional[Tuple[Any, Any, Dict]]:
+        """
+        Load (model, scaler, metadata) for a version, by default the current
+        one; with INFERENCE_ENGINE="compiled" a stored forest is returned as
+        its CompiledForest
+        """
+        import joblib
+        from .features import FEATURE_COLUMNS
+
+        version = version or self.current_version(namespace)
+        if version is None:
+            return None
+
+        version_dir = os.path.join(self._namespace_dir(namespace), version)
+        with open(os.path.join(version_dir, METADATA_FILE)) as f:
+            metadata = json.load(f)
+
+        if metadata.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported model artifact format in {version_dir}")
+        if metadata.get("feature_columns") != list(FEATURE_COLUMNS):
+            raise ValueError(f"Model artifact {version} was trained on different features")
+        for name, checksum in metadata.get("checksums", {}).items():
+            if file_checksum(os.path.join(version_dir, name)) != checksum:
+                raise ValueError(f"Checksum mismatch for {name} in {version_dir}")
+
+        scaler = joblib.load(os.path.join(version_dir, SCALER_FILE))
+        if settings.INFERENCE_ENGINE == "compiled" and metadata.get("forest"):
+            return self._load_forest(version_dir, metadata["forest"]), scaler, metadata
+        model = joblib.load(os.path.join(version_dir, MODEL_FILE))
+        return model, scaler, metadata
+
+    def _load_forest(self, version_dir: str, forest: Dict):
+        import numpy as np
+        from .compiled_forest import CompiledForest
+
+        mmap_mode = 'r' if settings.MODEL_MMAP else None
+        arrays = {
+            name: np.load(os.path.join(version_dir, FOREST_DIR, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in FOREST_ARRAYS
+        }
+        return CompiledForest(depth=forest["depth"], **arrays)
+
+
+model_store = ModelStore()
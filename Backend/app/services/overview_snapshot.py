@@ -0,0 +1,77 @@
+# backend/app/services/overview_snapshot.py
+import asyncio
+from datetime import datetime
+from typing import Dict, Optional
+
+from ..config import settings
+from ..database import get_database
+from .analytics_service import analytics_service
+
+
+class OverviewSnapshot:
+    """
+    System overview served from a snapshot refreshed in the background.
+
+    The snapshot is recomputed every OVERVIEW_REFRESH_SECONDS, or sooner when
+    new reports nudge it; nudges are coalesced so a burst of reports causes
+    at most one refresh per OVERVIEW_MIN_REFRESH_SECONDS. Responses carry the
+    time the snapshot was generated.
+    """
+
+    def __init__(self):
+        self.refresh_seconds = settings.OVERVIEW_REFRESH_SECONDS
+        self.min_refresh_seconds = settings.OVERVIEW_MIN_REFRESH_SECONDS
+        self._snapshot: Optional[Dict] = None
+        self._nudged = asyncio.Event()
+        self._refresh_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def nudge(self) -> None:
+        """Ask for an early refresh after new data arrived"""
+        self._nudged.set()
+
+    async def _loop(self) -> None:
+        while True:
+            self._nudged.clear()
+            try:
+                db = get_database()
+                if db is not None:
+                    await self.refresh(db)
+            except Exception as e:
+                print(f"Overview refresh failed: {e}")
+
+            try:
+                await asyncio.wait_for(self._nudged.wait(), timeout=self.refresh_seconds)
+                await asyncio.sleep(self.min_refresh_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def refresh(self, db) -> Dict:
+        async with self._refresh_lock:
+            overview = await analytics_service.get_system_overview(db)
+            overview["generated_at"] = datetime.utcnow()
+            self._snapshot = overview
+            return overview
+
+    async def get(self, db) -> Dict:
+        """Latest snapshot, computed on the spot only before the first refresh"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = await self.refresh(db)
+        return snapshot
+
+
+overview_snapshot = OverviewSnapshot()
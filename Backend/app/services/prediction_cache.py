@@ -0,0 +1,113 @@
+# backend/app/services/prediction_cache.py
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Hashable, Optional, Set, Tuple
+
+from ..config import settings
+
+
+class PredictionCache:
+    """
+    Size-bounded LRU cache of predictions with TTL expiry.
+
+    Entries are keyed by station and target-time bucket
+    (PREDICTION_CACHE_BUCKET_MINUTES wide), so every request for the same
+    station and period shares one computation. A station's entries are
+    dropped when a new crowd report for it is recorded in this worker;
+    reports taken by other workers are picked up when entries expire.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = None,
+        ttl_seconds: float = None,
+        bucket_minutes: int = None
+    ):
+        self.max_entries = max_entries or settings.PREDICTION_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds or settings.PREDICTION_CACHE_TTL_SECONDS
+        self.bucket_seconds = 60 * (bucket_minutes or settings.PREDICTION_CACHE_BUCKET_MINUTES)
+        self.enabled = settings.PREDICTION_CACHE_ENABLED
+
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, Dict]]" = OrderedDict()
+        self._station_keys: Dict[str, Set[Tuple[str, int]]] = {}
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ("hits", "misses", "evictions", "expirations", "invalidations"), 0
+        )
+
+    def _key(self, station_id: str, target_time: datetime) -> Tuple[str, int]:
+        return station_id, int(target_time.timestamp()) // self.bucket_seconds
+
+    def _remove(self, key: Tuple[str, int]) -> None:
+        self._entries.pop(key, None)
+        keys = self._station_keys.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._station_keys[key[0]]
+
+    def get(self, station_id: str, target_time: datetime) -> Optional[Dict]:
+        """Cached prediction for the target's bucket, stamped with the target time"""
+        if not self.enabled:
+            return None
+
+        key = self._key(station_id, target_time)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._remove(key)
+                self._counters["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+
+        return {**entry[1], "prediction_time": target_time.isoformat()}
+
+    def put(self, station_id: str, target_time: datetime, prediction: Dict) -> None:
+        if not self.enabled:
+            return
+
+        key = self._key(station_id, target_time)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, prediction)
+            self._entries.move_to_end(key)
+            self._station_keys.setdefault(station_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._counters["evictions"] += 1
+
+    def invalidate_station(self, station_id: Hashable) -> None:
+        """Drop every cached prediction of a station"""
+        with self._lock:
+            keys = self._station_keys.pop(station_id, ())
+            for key in keys:
+                self._entries.pop(key, None)
+            if keys:
+                self._counters["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._station_keys.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "bucket_minutes": self.bucket_seconds // 60,
+                "hit_ratio": round(self._counters["hits"] / lookups, 4) if lookups else 0.0
+            }
+
+
+prediction_cache = PredictionCache()
@@ -1,49 +1,159 @@
-import numpy as np
-import pandas as pd
+from __future__ import annotations
+
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional, Dict, Tuple
+import asyncio
 import pickle
 import os
+import threading
+import time
+import weakref
+from ..config import settings
 from ..database import get_database
+from .feature_store import feature_store
+from .latency import latency
+from .live_state import live_state
+from .model_registry import model_registry
+from .model_store import model_store
+from .prediction_cache import prediction_cache
+
+if TYPE_CHECKING:
+    # NumPy, pandas and scikit-learn are imported inside the methods that
+    # need them so that importing the API does not load the ML stack
+    import numpy as np
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.preprocessing import StandardScaler
+
+LEGACY_MODEL_PATH = "crowd_prediction_model.pkl"
 
 class CrowdPredictionService:
     def __init__(self):
-        self.model = None
-        self.scaler = StandardScaler()
-        self.feature_columns = [
-            'hour', 'day_of_week', 'is_weekend', 'month',
-            'is_rush_hour', 'is_morning_rush', 'is_evening_rush',
-            'historical_avg', 'recent_trend'
-        ]
-        self.load_model()
+        # (model, scaler) are swapped together so a prediction never pairs a
+        # new model with an old scaler; loaded lazily on first use
+        self._bundle = None
+        self._metadata = None
+        self._load_lock = threading.Lock()
+        self._version_checked_at = time.monotonic()
+        self._reload_pending = False
+        # model -> CompiledForest (or None when it cannot be compiled)
+        self._compiled = weakref.WeakKeyDictionary()
     
-    def load_model(self):
-        """Load pre-trained model or initialize a new one"""
-        model_path = "crowd_prediction_model.pkl"
-        if os.path.exists(model_path):
-            with open(model_path, 'rb') as f:
-                data = pickle.load(f)
-                self.model = data['model']
-                self.scaler = data['scaler']
-        else:
-            # Initialize with default RandomForest
-            self.model = RandomForestRegressor(
-                n_estimators=100,
-                max_depth=10,
-                random_state=42
-            )
+    @property
+    def feature_columns(self) -> List[str]:
+        from .features import FEATURE_COLUMNS
+        return FEATURE_COLUMNS
+    
+    @property
+    def model(self) -> Optional[RandomForestRegressor]:
+        return self._get_bundle()[0]
+    
+    @property
+    def scaler(self) -> Optional[StandardScaler]:
+        return self._get_bundle()[1]
+    
+    @property
+    def model_version(self) -> Optional[str]:
+        return self._metadata["version"] if self._metadata else None
+    
+    def _get_bundle(self) -> Tuple:
+        bundle = self._bundle
+        if bundle is None:
+            return self.load_model()
+        
+        # Pick up models saved by other workers off the request path; the
+        # current bundle keeps serving until the new one is swapped in
+        now = time.monotonic()
+        if now - self._version_checked_at >= settings.MODEL_RELOAD_CHECK_SECONDS and not self._reload_pending:
+            self._version_checked_at = now
+            self._reload_pending = True
+            threading.Thread(target=self._reload_if_changed, name="model-reload", daemon=True).start()
+        return bundle
+    
+    def _reload_if_changed(self) -> None:
+        try:
+            version = model_store.current_version()
+            if version is not None and version != self.model_version:
+                self.load_model(reload=True)
+        finally:
+            self._reload_pending = False
+    
+    def load_model(self, reload: bool = False) -> Tuple:
+        """Load the current model artifact, the legacy pickle, or nothing"""
+        with self._load_lock:
+            if self._bundle is not None and not reload:
+                return self._bundle
+            
+            try:
+                loaded = model_store.load()
+            except Exception as e:
+                print(f"Model load error: {e}")
+                loaded = None
+            
+            if loaded is not None:
+                model, scaler, metadata = loaded
+                # Compile before the swap so the first predictions do not pay for it
+                self._compiled_forest(model, scaler)
+                self._bundle = (model, scaler)
+                self._metadata = metadata
+                prediction_cache.clear()
+            elif self._bundle is None and os.path.exists(LEGACY_MODEL_PATH):
+                with open(LEGACY_MODEL_PATH, 'rb') as f:
+                    data = pickle.load(f)
+                    self._bundle = (data['model'], data['scaler'])
+            elif self._bundle is None:
+                # No trained model yet: predictions use the rule-based path
+                self._bundle = (None, None)
+            self._compiled_forest(*self._bundle)
+            return self._bundle
     
-    def save_model(self):
-        """Save trained model to disk"""
-        model_path = "crowd_prediction_model.pkl"
-        with open(model_path, 'wb') as f:
-            pickle.dump({
-                'model': self.model,
-                'scaler': self.scaler
-            }, f)
+    def install_model(
+        self,
+        model: RandomForestRegressor,
+        scaler: StandardScaler,
+        metadata: Optional[Dict] = None
+    ):
+        """Atomically replace the model used by new predictions"""
+        self._compiled_forest(model, scaler)
+        with self._load_lock:
+            self._bundle = (model, scaler)
+            if metadata is not None:
+                self._metadata = metadata
+        prediction_cache.clear()
+    
+    def _compiled_forest(self, model, scaler):
+        """Array-backed evaluator for a forest when INFERENCE_ENGINE is 'compiled'"""
+        if settings.INFERENCE_ENGINE != "compiled" or model is None:
+            return None
+        from .compiled_forest import CompiledForest, compile_forest
+        if isinstance(model, CompiledForest):
+            # Loaded from the stored (memory-mapped) node arrays
+            return model
+        if model not in self._compiled:
+            self._compiled[model] = compile_forest(model, scaler)
+        return self._compiled[model]
+    
+    def save_model(
+        self,
+        model: RandomForestRegressor,
+        scaler: StandardScaler,
+        metrics: Optional[Dict] = None
+    ) -> Dict:
+        """Save a trained model as a new versioned artifact, then install it"""
+        metadata = model_store.save(model, scaler, metrics)
+        self.install_model(model, scaler, metadata)
+        return metadata
+    
+    def save_station_model(
+        self,
+        station_id: str,
+        model: RandomForestRegressor,
+        scaler: StandardScaler,
+        metrics: Optional[Dict] = None
+    ) -> Dict:
+        """Store a station-specific model; the global model is left untouched"""
+        metadata = model_registry.save(station_id, model, scaler, metrics)
+        prediction_cache.invalidate_station(station_id)
+        return metadata
     
     def extract_time_features(self, target_time: datetime) -> Dict:
         """Extract time-based features from datetime"""
@@ -66,23 +176,10 @@ class CrowdPredictionService:
             'is_evening_rush': int(is_evening_rush)
         }
     
-    async def get_historical_data(self, station_id: str, days_back: int = 30) -> List[Dict]:
-        """Retrieve historical crowd data for a station"""
-        db = get_database()
-        if db is None:
-            return []
-        
-        cutoff_date = datetime.utcnow() - timedelta(days=days_back)
-        
-        cursor = db.crowd_reports.find({
-            "station_id": station_id,
-            "created_at": {"$gte": cutoff_date}
-        }).sort("created_at", -1)
-        
-        return await cursor.to_list(length=1000)
-    
     def calculate_historical_features(self, historical_data: List[Dict], target_time: datetime) -> Dict:
         """Calculate features based on historical data"""
+        import pandas as pd
+        
         if not historical_data:
             return {'historical_avg': 2.5, 'recent_trend': 0}
         
@@ -111,6 +208,108 @@ class CrowdPredictionService:
             'recent_trend': float(recent_trend)
         }
     
+    def predict_batch(
+        self,
+        target_times: List[datetime],
+        historical_avg: np.ndarray,
+        recent_trend: np.ndarray,
+        history_size: int,
+        station_id: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Predict crowd levels for many target times of one station with a
+        single feature matrix and a single model call
+        """
+        from . import features
+        
+        with latency.stage("feature_matrix"):
+            X = features.feature_matrix(
+                features.to_datetime64(target_times), historical_avg, recent_trend
+            )
+        
+        predicted, confidence = self._predict_matrix(X, station_id)
+        
+        # Calculate confidence based on data availability
+        if history_size > 50:
+            confidence += 0.1
+        elif history_size > 20:
+            confidence += 0.05
+        
+        confidence = min(1.0, confidence)
+        
+        predictions = [
+            self._format_prediction(float(predicted[i]), confidence, X[i], target_time)
+            for i, target_time in enumerate(target_times)
+        ]
+        
+        # Live signal from the last reports, alongside the model factors
+        live_factors = live_state.factors(station_id) if station_id else {}
+        if live_factors:
+            for prediction in predictions:
+                prediction["factors"].update(live_factors)
+        return predictions
+    
+    def _predict_matrix(self, X: np.ndarray, station_id: Optional[str] = None) -> Tuple[np.ndarray, float]:
+        """
+        Run the station's own model, the global model or the rule-based
+        fallback over a feature matrix
+        """
+        import numpy as np
+        from . import features
+        
+        with latency.stage("model_load"):
+            station_bundle = model_registry.get(station_id) if station_id else None
+            model, scaler = station_bundle or self._get_bundle()
+        if model is not None and hasattr(model, 'predict'):
+            try:
+                compiled = self._compiled_forest(model, scaler)
+                if compiled is not None:
+                    # Scaling is folded into the compiled evaluator
+                    with latency.stage("model_predict"):
+                        predicted = compiled.predict(X)
+                else:
+                    with latency.stage("scaler_transform"):
+                        X_scaled = scaler.transform(X)
+                    with latency.stage("model_predict"):
+                        predicted = model.predict(X_scaled)
+                confidence = 0.8  # Model-based confidence
+                latency.set_path("station_model" if station_bundle else "model")
+            except Exception:
+                # Fallback to rule-based prediction
+                predicted = features.rule_based_predictions(X)
+                confidence = 0.6
+                latency.set_path("rule_based")
+        else:
+            # Use rule-based prediction
+            predicted = features.rule_based_predictions(X)
+            confidence = 0.6
+            latency.set_path("rule_based")
+        
+        # Ensure predictions are within valid range
+        return np.clip(predicted, 1.0, 5.0), confidence
+    
+    def _format_prediction(
+        self,
+        predicted_crowd: float,
+        confidence: float,
+        feature_row: np.ndarray,
+        target_time: datetime
+    ) -> Dict:
+        """Build the prediction payload for one row of the feature matrix"""
+        row = dict(zip(self.feature_columns, feature_row))
+        return {
+            "predicted_crowd_level": round(predicted_crowd, 2),
+            "confidence_score": round(confidence, 2),
+            "factors": {
+                "time_of_day": "rush" if row['is_rush_hour'] else "normal",
+                "day_type": "weekend" if row['is_weekend'] else "weekday",
+                "historical_average": round(float(row['historical_avg']), 2),
+                "recent_trend": "increasing" if row['recent_trend'] > 0.1 else 
+                              "decreasing" if row['recent_trend'] < -0.1 else "stable"
+            },
+            "prediction_time": target_time.isoformat()
+        }
+    
     async def predict_crowd_level(
         self, 
         station_id: str, 
@@ -119,81 +318,31 @@ class CrowdPredictionService:
         """
         Predict crowd level for a station at a specific time using ML
         """
+        with latency.stage("cache_lookup"):
+            cached = prediction_cache.get(station_id, target_time)
+        if cached is not None:
+            latency.set_path("cached")
+            return cached
+        
         try:
-            # Extract time features
-            time_features = self.extract_time_features(target_time)
+            # Read precomputed historical aggregates from the feature store
+            with latency.stage("feature_store"):
+                historical_avg, recent_trend, history_size = await feature_store.get_profile(
+                    get_database(), station_id
+                )
             
-            # Get historical data
-            historical_data = await self.get_historical_data(station_id)
-            historical_features = self.calculate_historical_features(historical_data, target_time)
-            
-            # Combine all features
-            features = {**time_features, **historical_features}
-            
-            # Create feature vector
-            feature_vector = np.array([[features[col] for col in self.feature_columns]])
-            
-            # Make prediction
-            if self.model is not None and hasattr(self.model, 'predict'):
-                try:
-                    scaled_features = self.scaler.transform(feature_vector)
-                    predicted_crowd = self.model.predict(scaled_features)[0]
-                    confidence = 0.8  # Model-based confidence
-                except Exception:
-                    # Fallback to rule-based prediction
-                    predicted_crowd = self._rule_based_prediction(features)
-                    confidence = 0.6
-            else:
-                # Use rule-based prediction
-                predicted_crowd = self._rule_based_prediction(features)
-                confidence = 0.6
-            
-            # Ensure prediction is within valid range
-            predicted_crowd = max(1.0, min(5.0, float(predicted_crowd)))
-            
-            # Calculate confidence based on data availability
-            if len(historical_data) > 50:
-                confidence += 0.1
-            elif len(historical_data) > 20:
-                confidence += 0.05
-            
-            confidence = min(1.0, confidence)
-            
-            return {
-                "predicted_crowd_level": round(predicted_crowd, 2),
-                "confidence_score": round(confidence, 2),
-                "factors": {
-                    "time_of_day": "rush" if features['is_rush_hour'] else "normal",
-                    "day_type": "weekend" if features['is_weekend'] else "weekday",
-                    "historical_average": round(features['historical_avg'], 2),
-                    "recent_trend": "increasing" if features['recent_trend'] > 0.1 else 
-                                  "decreasing" if features['recent_trend'] < -0.1 else "stable"
-                },
-                "prediction_time": target_time.isoformat()
-            }
+            prediction = self.predict_batch(
+                [target_time], historical_avg, recent_trend, history_size, station_id
+            )[0]
+            prediction_cache.put(station_id, target_time, prediction)
+            return prediction
             
         except Exception as e:
             print(f"Prediction error: {e}")
             # Fallback prediction
+            latency.set_path("fallback")
             return self._fallback_prediction(target_time)
     
-    def _rule_based_prediction(self, features: Dict) -> float:
-        """Rule-based prediction as fallback"""
-        base_crowd = features['historical_avg']
-        
-        # Adjust for time patterns
-        if features['is_morning_rush']:
-            base_crowd += 1.0
-        elif features['is_evening_rush']:
-            base_crowd += 1.2
-        elif features['is_weekend'] and 11 <= features['hour'] <= 20:
-            base_crowd += 0.5
-        
-        # Apply recent trend
-        base_crowd += features['recent_trend'] * 0.5
-        
-        return base_crowd
-    
     def _fallback_prediction(self, target_time: datetime) -> Dict:
         """Simple fallback prediction when all else fails"""
         hour = target_time.hour
@@ -223,81 +372,242 @@ class CrowdPredictionService:
         hours_ahead: int = 24
     ) -> List[Dict]:
         """Get hourly predictions for the next N hours"""
-        predictions = []
         current_time = datetime.utcnow()
+        target_times = [current_time + timedelta(hours=i) for i in range(hours_ahead)]
         
-        for i in range(hours_ahead):
-            target_time = current_time + timedelta(hours=i)
-            pred = await self.predict_crowd_level(station_id, target_time)
-            predictions.append(pred)
+        with latency.stage("cache_lookup"):
+            cached = [prediction_cache.get(station_id, t) for t in target_times]
+        if all(p is not None for p in cached):
+            latency.set_path("cached")
+            return cached
         
-        return predictions
+        try:
+            # Read the station profile once and predict the whole horizon in one call
+            with latency.stage("feature_store"):
+                historical_avg, recent_trend, history_size = await feature_store.get_profile(
+                    get_database(), station_id
+                )
+            
+            predictions = self.predict_batch(
+                target_times, historical_avg, recent_trend, history_size, station_id
+            )
+            for target_time, prediction in zip(target_times, predictions):
+                prediction_cache.put(station_id, target_time, prediction)
+            return predictions
+        except Exception as e:
+            print(f"Prediction error: {e}")
+            latency.set_path("fallback")
+            return [self._fallback_prediction(t) for t in target_times]
     
-    async def train_model_with_data(self, station_id: Optional[str] = None):
-        """Train the model with available historical data"""
+    async def get_network_predictions(
+        self,
+        hours_ahead: int = 24,
+        station_ids: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Forecast grid (stations x hours) for the whole network using the
+        feature store profiles and a single model call
+        """
+        import numpy as np
+        
         db = get_database()
         if db is None:
-            return False
+            return {"station_ids": [], "timestamps": [], "values": [], "confidence": []}
         
-        # Get training data
-        query = {"station_id": station_id} if station_id else {}
-        cursor = db.crowd_reports.find(query)
-        data = await cursor.to_list(length=10000)
+        if station_ids is None:
+            cursor = db.stations.find({}, {"_id": 1})
+            station_ids = [str(s["_id"]) for s in await cursor.to_list(length=None)]
         
-        if len(data) < 50:  # Minimum data requirement
-            print(f"Insufficient data for training: {len(data)} records")
-            return False
+        current_time = datetime.utcnow()
+        target_times = [current_time + timedelta(hours=i) for i in range(hours_ahead)]
         
-        # Prepare training data
-        X = []
-        y = []
+        # Precomputed per-station profiles, mirror misses fetched in one query
+        historical_avg, recent_trend, history_sizes = await feature_store.get_profiles(
+            db, station_ids
+        )
+        # The feature matrix and model call for the whole grid run off the event loop
+        loop = asyncio.get_running_loop()
+        _, predicted, confidence = await loop.run_in_executor(
+            None,
+            self.predict_network,
+            target_times, historical_avg, recent_trend, history_sizes, station_ids
+        )
         
-        for report in data:
-            created_at = report['created_at']
-            if isinstance(created_at, str):
-                created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-            
-            time_features = self.extract_time_features(created_at)
-            
-            # Get historical context for this report
-            historical_data = [r for r in data if r['created_at'] < report['created_at']]
-            historical_features = self.calculate_historical_features(historical_data, created_at)
+        return {
+            "station_ids": station_ids,
+            "timestamps": [t.isoformat() for t in target_times],
+            "values": np.round(predicted, 2).tolist(),
+            "confidence": np.round(confidence, 2).tolist()
+        }
+    
+    def predict_network(
+        self,
+        target_times: List[datetime],
+        historical_avg: np.ndarray,
+        recent_trend: np.ndarray,
+        history_sizes: np.ndarray,
+        station_ids: Optional[List[str]] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Feature matrix, (stations x targets) predictions and per-station
+        confidence for stacked station profiles, with a single call to the
+        global model; stations with a model of their own are re-predicted
+        with it
+        """
+        import numpy as np
+        from . import features
+        
+        X = features.network_feature_matrix(
+            features.to_datetime64(target_times), historical_avg, recent_trend
+        )
+        predicted, global_confidence = self._predict_matrix(X)
+        predicted = predicted.reshape(len(historical_avg), len(target_times))
+        base_confidence = np.full(len(historical_avg), global_confidence)
+        
+        for s, station_id in enumerate(station_ids or []):
+            if model_registry.get(station_id) is not None:
+                rows = X[s * len(target_times):(s + 1) * len(target_times)]
+                predicted[s], base_confidence[s] = self._predict_matrix(rows, station_id)
+        
+        # Same data-availability bonus as predict_batch, per station
+        confidence = base_confidence + np.where(
+            history_sizes > 50, 0.1, np.where(history_sizes > 20, 0.05, 0.0)
+        )
+        
+        return X, predicted, np.minimum(confidence, 1.0)
+    
+    async def stream_training_batches(
+        self,
+        station_id: Optional[str] = None,
+        batch_size: Optional[int] = None
+    ) -> AsyncIterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Yield (station_codes, times, levels) NumPy batches of crowd reports,
+        ordered by station and time, without a document cap
+        """
+        import numpy as np
+        from . import features
+        from .training import TRAINING_PROJECTION
+        
+        db = get_database()
+        if db is None:
+            return
+        
+        batch_size = batch_size or settings.TRAINING_BATCH_SIZE
+        query = {"station_id": station_id} if station_id else {}
+        # Walks the (station_id, created_at) index backwards: stations stay
+        # contiguous and each station's reports come oldest first
+        cursor = db.crowd_reports.find(query, TRAINING_PROJECTION).sort(
+            [("station_id", -1), ("created_at", 1)]
+        ).batch_size(batch_size)
+        
+        station_codes: Dict[str, int] = {}
+        pending: List[Dict] = []
+        while True:
+            fetched = await cursor.to_list(length=batch_size)
+            exhausted = len(fetched) < batch_size
+            docs = pending + fetched
+            if not docs:
+                return
             
-            features = {**time_features, **historical_features}
-            feature_vector = [features[col] for col in self.feature_columns]
+            pending = []
+            if not exhausted:
+                # Hold back the trailing reports made at the same instant so
+                # ties never straddle two batches
+                last = docs[-1]
+                cut = len(docs)
+                while cut > 0 and docs[cut - 1]['station_id'] == last['station_id'] \
+                        and docs[cut - 1]['created_at'] == last['created_at']:
+                    cut -= 1
+                docs, pending = docs[:cut], docs[cut:]
             
-            X.append(feature_vector)
-            y.append(report['crowd_level'])
+            if docs:
+                yield (
+                    np.fromiter(
+                        (station_codes.setdefault(d['station_id'], len(station_codes)) for d in docs),
+                        dtype=np.int32, count=len(docs)
+                    ),
+                    features.to_datetime64(d['created_at'] for d in docs),
+                    np.fromiter((d['crowd_level'] for d in docs), dtype=np.float32, count=len(docs))
+                )
+            if exhausted:
+                return
+    
+    async def load_training_data(
+        self,
+        station_id: Optional[str] = None
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Station codes, timestamps and crowd levels of all training reports"""
+        from .training import MIN_TRAINING_SAMPLES, TrainingColumns
         
-        X = np.array(X)
-        y = np.array(y)
+        db = get_database()
+        if db is None:
+            return None
+        
+        # Preallocate from the expected size; the columns grow if it is exceeded
+        if station_id:
+            expected = await db.crowd_reports.count_documents({"station_id": station_id})
+        else:
+            expected = await db.crowd_reports.estimated_document_count()
         
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        columns = TrainingColumns(expected)
+        async for batch in self.stream_training_batches(station_id):
+            columns.extend(*batch)
         
-        # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
+        if columns.size < MIN_TRAINING_SAMPLES:  # Minimum data requirement
+            print(f"Insufficient data for training: {columns.size} records")
+            return None
         
-        # Initialize model if not already done
-        if self.model is None:
-            self.model = RandomForestRegressor(
-                n_estimators=100,
-                max_depth=10,
-                random_state=42
-            )
+        return columns.arrays()
+    
+    async def fit_incremental(self, station_id: Optional[str] = None) -> Optional[Tuple]:
+        """
+        Stream reports through the feature builder into the incremental
+        learner; returns (model, scaler, metrics) or None without enough data
+        """
+        from . import features
+        from .training import MIN_TRAINING_SAMPLES, StreamingLinearTrainer
+        
+        loop = asyncio.get_running_loop()
+        builder = features.StreamingFeatureBuilder(datetime.utcnow())
+        trainer = StreamingLinearTrainer(len(self.feature_columns))
         
-        # Train model
-        self.model.fit(X_train_scaled, y_train)
+        def consume(codes, times, levels):
+            trainer.partial_fit(builder.transform(codes, times, levels), levels)
         
-        # Evaluate
-        train_score = self.model.score(X_train_scaled, y_train)
-        test_score = self.model.score(X_test_scaled, y_test)
+        async for batch in self.stream_training_batches(station_id):
+            await loop.run_in_executor(None, consume, *batch)
         
-        print(f"Model trained - Train Score: {train_score:.3f}, Test Score: {test_score:.3f}")
+        if trainer.n_samples < MIN_TRAINING_SAMPLES:
+            print(f"Insufficient data for training: {trainer.n_samples} records")
+            return None
         
-        # Save model
-        self.save_model()
+        return trainer.finalize()
+    
+    async def train_model_with_data(self, station_id: Optional[str] = None):
+        """Train the model in-process with available historical data"""
+        from .training import fit_model
+        
+        if settings.TRAINING_MODE == "incremental":
+            result = await self.fit_incremental(station_id)
+            if result is None:
+                return False
+            model, scaler, metrics = result
+        else:
+            training_data = await self.load_training_data(station_id)
+            if training_data is None:
+                return False
+            model, scaler, metrics = fit_model(*training_data, datetime.utcnow())
+        
+        print(f"Model trained - Train Score: {metrics['train_score']:.3f}, "
+              f"Test Score: {metrics['test_score']:.3f}")
+        
+        if station_id:
+            from .forecast_materializer import forecast_materializer
+            self.save_station_model(station_id, model, scaler, metrics)
+            await forecast_materializer.materialize(get_database(), [station_id])
+        else:
+            self.save_model(model, scaler, metrics)
         
         return True
 
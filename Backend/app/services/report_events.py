@@ -0,0 +1,36 @@
+# backend/app/services/report_events.py
+import asyncio
+from typing import Dict, List
+
+from .feature_store import feature_store
+from .live_state import live_state
+from .overview_snapshot import overview_snapshot
+from .prediction_cache import prediction_cache
+from .report_rollups import report_rollups
+
+
+async def on_report_created(db, report: Dict) -> None:
+    """Propagate a newly stored crowd report to the state derived from reports"""
+    live_state.record(report["station_id"], report["created_at"], report["crowd_level"], report.get("_id"))
+    args = (db, report["station_id"], report["created_at"], report["crowd_level"])
+    await asyncio.gather(
+        feature_store.record_report(*args),
+        report_rollups.record_report(*args)
+    )
+    prediction_cache.invalidate_station(report["station_id"])
+    overview_snapshot.nudge()
+
+
+async def on_reports_created(db, reports: List[Dict]) -> None:
+    """Batched on_report_created for reports stored together"""
+    if not reports:
+        return
+    for report in reports:
+        live_state.record(report["station_id"], report["created_at"], report["crowd_level"], report.get("_id"))
+    await asyncio.gather(
+        feature_store.record_reports(db, reports),
+        report_rollups.record_reports(db, reports)
+    )
+    for station_id in {report["station_id"] for report in reports}:
+        prediction_cache.invalidate_station(station_id)
+    overview_snapshot.nudge()
@@ -0,0 +1,225 @@
+# backend/app/services/report_rollups.py
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from pymongo import ReplaceOne, UpdateOne
+
+COLLECTION = "crowd_report_hourly"
+WRITE_BATCH = 1000
+
+
+def hour_bucket(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def rollup_id(station_id: str, hour: datetime) -> str:
+    return f"{station_id}:{hour:%Y-%m-%dT%H}"
+
+
+class ReportRollups:
+    """
+    Hourly per-station rollups of crowd reports.
+
+    One crowd_report_hourly document per (station_id, hour) holds the count,
+    sum, min and max of the levels reported in that hour. Documents are
+    upserted as reports arrive and can be rebuilt from crowd_reports, so
+    analytics read a few documents per station-hour instead of every raw
+    report.
+    """
+
+    async def record_report(self, db, station_id: str, created_at: datetime, crowd_level: int) -> None:
+        """Fold a new report into its station-hour document"""
+        hour = hour_bucket(created_at)
+        await db[COLLECTION].update_one(
+            {"_id": rollup_id(station_id, hour)},
+            {
+                "$setOnInsert": {"station_id": station_id, "hour": hour},
+                "$inc": {"count": 1, "sum": crowd_level},
+                "$min": {"min": crowd_level},
+                "$max": {"max": crowd_level}
+            },
+            upsert=True
+        )
+
+    async def record_reports(self, db, reports: List[Dict]) -> None:
+        """Fold many new reports in, with one upsert per station-hour in a single bulk write"""
+        groups: Dict[str, Dict] = {}
+        for report in reports:
+            hour = hour_bucket(report["created_at"])
+            crowd_level = report["crowd_level"]
+            group = groups.setdefault(rollup_id(report["station_id"], hour), {
+                "station_id": report["station_id"],
+                "hour": hour,
+                "count": 0,
+                "sum": 0,
+                "min": crowd_level,
+                "max": crowd_level
+            })
+            group["count"] += 1
+            group["sum"] += crowd_level
+            group["min"] = min(group["min"], crowd_level)
+            group["max"] = max(group["max"], crowd_level)
+
+        operations = [
+            UpdateOne(
+                {"_id": _id},
+                {
+                    "$setOnInsert": {"station_id": group["station_id"], "hour": group["hour"]},
+                    "$inc": {"count": group["count"], "sum": group["sum"]},
+                    "$min": {"min": group["min"]},
+                    "$max": {"max": group["max"]}
+                },
+                upsert=True
+            )
+            for _id, group in groups.items()
+        ]
+        if operations:
+            await db[COLLECTION].bulk_write(operations, ordered=False)
+
+    async def rebuild(self, db, since: Optional[datetime] = None) -> int:
+        """
+        Recompute rollups from crowd_reports, for all history or from the
+        hour containing `since`; returns the number of documents written
+        """
+        match = {}
+        if since is not None:
+            since = hour_bucket(since)
+            match = {"created_at": {"$gte": since}}
+
+        pipeline = [
+            {"$match": match},
+            {
+                "$group": {
+                    "_id": {
+                        "station_id": "$station_id",
+                        "hour": {"$dateToString": {"format": "%Y-%m-%dT%H", "date": "$created_at"}}
+                    },
+                    "count": {"$sum": 1},
+                    "sum": {"$sum": "$crowd_level"},
+                    "min": {"$min": "$crowd_level"},
+                    "max": {"$max": "$crowd_level"}
+                }
+            }
+        ]
+
+        await db[COLLECTION].delete_many({"hour": {"$gte": since}} if since is not None else {})
+
+        written = 0
+        operations = []
+        async for group in db.crowd_reports.aggregate(pipeline, allowDiskUse=True):
+            station_id = group["_id"]["station_id"]
+            hour = datetime.strptime(group["_id"]["hour"], "%Y-%m-%dT%H")
+            _id = rollup_id(station_id, hour)
+            operations.append(ReplaceOne({"_id": _id}, {
+                "_id": _id,
+                "station_id": station_id,
+                "hour": hour,
+                "count": group["count"],
+                "sum": group["sum"],
+                "min": group["min"],
+                "max": group["max"]
+            }, upsert=True))
+            if len(operations) >= WRITE_BATCH:
+                await db[COLLECTION].bulk_write(operations, ordered=False)
+                written += len(operations)
+                operations = []
+        if operations:
+            await db[COLLECTION].bulk_write(operations, ordered=False)
+            written += len(operations)
+        return written
+
+    async def hour_of_day_stats(self, db, station_id: str, since: datetime) -> List[Dict]:
+        """
+        Count, sum, min and max per hour of day (0-23) for reports at or
+        after `since`, sorted by hour.
+
+        Whole hours come from rollups; the reports of the partial first hour
+        are read raw so the window is exact.
+        """
+        first_full_hour = hour_bucket(since)
+        if first_full_hour < since:
+            first_full_hour += timedelta(hours=1)
+
+        def by_hour_of_day(date_field: str, count, total, low, high) -> List[Dict]:
+            return [
+                {
+                    "$group": {
+                        "_id": {"$hour": date_field},
+                        "count": {"$sum": count},
+                        "sum": {"$sum": total},
+                        "min": {"$min": low},
+                        "max": {"$max": high}
+                    }
+                }
+            ]
+
+        rollup_pipeline = [
+            {"$match": {"station_id": station_id, "hour": {"$gte": first_full_hour}}},
+            *by_hour_of_day("$hour", "$count", "$sum", "$min", "$max")
+        ]
+        head_pipeline = [
+            {"$match": {"station_id": station_id, "created_at": {"$gte": since, "$lt": first_full_hour}}},
+            *by_hour_of_day("$created_at", 1, "$crowd_level", "$crowd_level", "$crowd_level")
+        ]
+
+        rollup_rows, head_rows = await asyncio.gather(
+            db[COLLECTION].aggregate(rollup_pipeline).to_list(length=None),
+            db.crowd_reports.aggregate(head_pipeline).to_list(length=None)
+        )
+
+        hours: Dict[int, Dict] = {}
+        for row in rollup_rows + head_rows:
+            if not row["count"]:
+                continue
+            stats = hours.setdefault(
+                row["_id"],
+                {"hour": row["_id"], "count": 0, "sum": 0, "min": row["min"], "max": row["max"]}
+            )
+            stats["count"] += row["count"]
+            stats["sum"] += row["sum"]
+            stats["min"] = min(stats["min"], row["min"])
+            stats["max"] = max(stats["max"], row["max"])
+        return [hours[hour] for hour in sorted(hours)]
+
+    async def current_level(self, db, station_id: str, now: Optional[datetime] = None) -> Optional[float]:
+        """
+        Average level over roughly the last hour: the current hour's rollup
+        plus the previous hour's weighted by how much of it is still inside
+        the window, assuming reports are spread evenly within an hour
+        """
+        levels = await self.current_levels(db, [station_id], now)
+        return levels.get(station_id)
+
+    async def current_levels(
+        self,
+        db,
+        station_ids: List[str],
+        now: Optional[datetime] = None
+    ) -> Dict[str, float]:
+        """
+        `current_level` for many stations in one query; stations without
+        reports in the window are left out
+        """
+        if not station_ids:
+            return {}
+        now = now or datetime.utcnow()
+        current_hour = hour_bucket(now)
+        previous_hour = current_hour - timedelta(hours=1)
+        ids = [rollup_id(station_id, hour) for station_id in station_ids for hour in (current_hour, previous_hour)]
+        docs = await db[COLLECTION].find({"_id": {"$in": ids}}).to_list(length=len(ids))
+
+        overlap = 1 - (now - current_hour).total_seconds() / 3600
+        totals: Dict[str, List[float]] = {}
+        for doc in docs:
+            weight = overlap if doc["hour"] == previous_hour else 1.0
+            station_total = totals.setdefault(doc["station_id"], [0.0, 0.0])
+            station_total[0] += weight * doc["sum"]
+            station_total[1] += weight * doc["count"]
+        return {
+            station_id: total / count
+            for station_id, (total, count) in totals.items()
+            if count > 0
+        }
+
+report_rollups = ReportRollups()
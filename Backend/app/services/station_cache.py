@@ -0,0 +1,106 @@
+# backend/app/services/station_cache.py
+import asyncio
+from typing import Dict, List, Optional
+
+from bson import ObjectId
+
+from ..config import settings
+from ..database import get_database
+
+
+class StationCache:
+    """
+    In-process copy of the station table.
+
+    Loaded at startup and reloaded every STATION_CACHE_REFRESH_SECONDS to
+    pick up stations created by other workers; create_station writes
+    through with `add`. Lookups of ids that are not cached fall back to one
+    find_one and cache the station if it exists, so a station is never
+    reported missing just because it is newer than the last reload.
+    `version` changes whenever the contents do.
+    """
+
+    def __init__(self):
+        self.refresh_seconds = settings.STATION_CACHE_REFRESH_SECONDS
+        self.ready = False
+        self.version = 0
+        self._stations: Dict[str, Dict] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                db = get_database()
+                if db is not None:
+                    await self.refresh(db)
+            except Exception as e:
+                print(f"Station cache refresh failed: {e}")
+            await asyncio.sleep(self.refresh_seconds if self.ready else 5)
+
+    async def refresh(self, db) -> int:
+        """Reload every station; returns their number"""
+        stations = await db.stations.find().to_list(length=None)
+        self._stations = {str(station["_id"]): station for station in stations}
+        self.version += 1
+        self.ready = True
+        return len(stations)
+
+    def add(self, station: Dict) -> None:
+        """Write-through for a created or updated station"""
+        self._stations[str(station["_id"])] = station
+        self.version += 1
+
+    async def get(self, db, station_id: str) -> Optional[Dict]:
+        """
+        Station document by id, or None if it does not exist; raises
+        InvalidId for malformed ids
+        """
+        object_id = ObjectId(station_id)
+        station = self._stations.get(str(object_id))
+        if station is None:
+            station = await db.stations.find_one({"_id": object_id})
+            if station is not None:
+                self.add(station)
+        return station
+
+    async def get_many(self, db, station_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Existing stations among valid ids, keyed by normalized id, with one
+        $in query for the ids that are not cached; raises InvalidId for
+        malformed ids
+        """
+        found = {}
+        missing = []
+        for station_id in {str(ObjectId(station_id)) for station_id in station_ids}:
+            station = self._stations.get(station_id)
+            if station is not None:
+                found[station_id] = station
+            else:
+                missing.append(ObjectId(station_id))
+        if missing:
+            async for station in db.stations.find({"_id": {"$in": missing}}):
+                self.add(station)
+                found[str(station["_id"])] = station
+        return found
+
+    async def all(self, db) -> List[Dict]:
+        """Every station, loading the table on first use before startup finished"""
+        if not self.ready:
+            await self.refresh(db)
+        return list(self._stations.values())
+
+
+station_cache = StationCache()
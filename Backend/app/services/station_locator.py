@@ -0,0 +1,151 @@
+# backend/app/services/station_locator.py
+import heapq
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+from pymongo.errors import OperationFailure
+
+from ..config import settings
+from .station_cache import station_cache
+
+EARTH_RADIUS_M = 6_371_008.8
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+STATION_FIELDS = ("name", "line", "latitude", "longitude", "station_type", "created_at")
+# Mongo's "unable to find index for $geoNear query"
+NO_QUERY_EXECUTION_PLANS = 291
+GEO_NEAR_RETRY_SECONDS = 30
+
+
+def geo_point(latitude: float, longitude: float) -> Dict:
+    """GeoJSON point stored in a station's `location` field (longitude first)"""
+    return {"type": "Point", "coordinates": [longitude, latitude]}
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GridIndex:
+    """
+    Uniform latitude/longitude grid over station coordinates.
+
+    A radius query only measures the stations in the cells overlapping the
+    query's bounding box, or every station when that box spans more cells
+    than there are stations.
+    """
+
+    def __init__(self, cell_degrees: float):
+        self.cell_degrees = cell_degrees
+        self.stations: List[Dict] = []
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return int(math.floor(latitude / self.cell_degrees)), int(math.floor(longitude / self.cell_degrees))
+
+    def add(self, station: Dict) -> None:
+        self.cells.setdefault(self._cell(station["latitude"], station["longitude"]), []).append(len(self.stations))
+        self.stations.append(station)
+
+    def _candidates(self, latitude: float, longitude: float, radius_m: float):
+        d_lat = radius_m / METERS_PER_DEGREE
+        cos_lat = math.cos(math.radians(latitude))
+        d_lon = 360.0 if cos_lat < 1e-6 else min(360.0, d_lat / cos_lat)
+        low_i, low_j = self._cell(latitude - d_lat, longitude - d_lon)
+        high_i, high_j = self._cell(latitude + d_lat, longitude + d_lon)
+        if (high_i - low_i + 1) * (high_j - low_j + 1) > len(self.stations) or d_lon >= 180:
+            return self.stations
+        # Cells are wrapped neither at the poles nor the antimeridian, so
+        # boxes crossing them are covered by the full scan above
+        return [
+            self.stations[index]
+            for i in range(low_i, high_i + 1)
+            for j in range(low_j, high_j + 1)
+            for index in self.cells.get((i, j), ())
+        ]
+
+    def nearest(self, latitude: float, longitude: float, radius_m: float, limit: int) -> List[Tuple[float, Dict]]:
+        """Up to `limit` (distance_m, station) pairs within `radius_m`, nearest first"""
+        within = []
+        for station in self._candidates(latitude, longitude, radius_m):
+            distance = haversine_m(latitude, longitude, station["latitude"], station["longitude"])
+            if distance <= radius_m:
+                within.append((distance, station))
+        return heapq.nsmallest(limit, within, key=lambda pair: pair[0])
+
+
+class StationLocator:
+    """
+    Nearest-station search.
+
+    With NEARBY_SEARCH_BACKEND="mongo" queries run as $geoNear on the
+    2dsphere index over stations.location. With NEARBY_SEARCH_BACKEND=
+    "memory" they are answered from an in-process GridIndex over the
+    station cache, rebuilt whenever the cache changes. A failed $geoNear
+    falls back to the grid for that call and for the next
+    GEO_NEAR_RETRY_SECONDS; only a missing 2dsphere index (init_db.py not
+    run) switches the process to the grid for good.
+    """
+
+    def __init__(self):
+        self.backend = settings.NEARBY_SEARCH_BACKEND
+        self.cell_degrees = settings.NEARBY_GRID_CELL_DEGREES
+        self._grid: Optional[GridIndex] = None
+        self._grid_version = -1
+        self._retry_at = 0.0
+
+    async def _load_grid(self, db) -> GridIndex:
+        if self._grid is None or self._grid_version != station_cache.version:
+            stations = await station_cache.all(db)
+            grid = GridIndex(self.cell_degrees)
+            for station in stations:
+                grid.add(station)
+            self._grid = grid
+            self._grid_version = station_cache.version
+        return self._grid
+
+    async def _geo_near(self, db, latitude: float, longitude: float, radius_m: float, limit: int):
+        pipeline = [
+            {
+                "$geoNear": {
+                    "near": geo_point(latitude, longitude),
+                    "distanceField": "distance_m",
+                    "maxDistance": radius_m,
+                    "spherical": True,
+                    "key": "location"
+                }
+            },
+            {"$limit": limit},
+            {"$project": {"distance_m": 1, **{field: 1 for field in STATION_FIELDS}}}
+        ]
+        rows = await db.stations.aggregate(pipeline).to_list(length=limit)
+        return [(row.pop("distance_m"), row) for row in rows]
+
+    async def nearest(
+        self,
+        db,
+        latitude: float,
+        longitude: float,
+        radius_m: float,
+        limit: int
+    ) -> List[Tuple[float, Dict]]:
+        """Up to `limit` (distance_m, station document) pairs within `radius_m`, nearest first"""
+        if self.backend == "mongo" and time.monotonic() >= self._retry_at:
+            try:
+                return await self._geo_near(db, latitude, longitude, radius_m, limit)
+            except OperationFailure as e:
+                if e.code == NO_QUERY_EXECUTION_PLANS or "unable to find index" in str(e):
+                    print(f"No 2dsphere index on stations.location, using the in-process station grid: {e}")
+                    self.backend = "memory"
+                else:
+                    print(f"$geoNear failed, using the in-process station grid for {GEO_NEAR_RETRY_SECONDS}s: {e}")
+                    self._retry_at = time.monotonic() + GEO_NEAR_RETRY_SECONDS
+        grid = await self._load_grid(db)
+        return grid.nearest(latitude, longitude, radius_m, limit)
+
+
+station_locator = StationLocator()
@@ -0,0 +1,185 @@
+# backend/app/services/training.py
+from datetime import datetime
+from typing import Dict, Tuple
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from . import features
+
+MIN_TRAINING_SAMPLES = 50
+
+# Only the fields the feature builder needs
+TRAINING_PROJECTION = {"_id": 0, "station_id": 1, "crowd_level": 1, "created_at": 1}
+
+
+def new_model(n_jobs: int = None) -> RandomForestRegressor:
+    """Untrained forest with the service's default hyperparameters"""
+    return RandomForestRegressor(
+        n_estimators=100,
+        max_depth=10,
+        random_state=42,
+        n_jobs=n_jobs
+    )
+
+
+def fit_model(
+    station_codes: np.ndarray,
+    times: np.ndarray,
+    levels: np.ndarray,
+    now: datetime,
+    n_jobs: int = None
+) -> Tuple[RandomForestRegressor, StandardScaler, Dict]:
+    """
+    Build the training matrix and fit a fresh scaler and forest.
+
+    Only takes plain arrays so it can run in a worker process; the caller
+    decides when to swap the returned model into the prediction service.
+    """
+    X = features.build_training_features(station_codes, times, levels, now)
+    y = np.asarray(levels, dtype=np.float64)
+
+    # Split data
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    # Scale features
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+
+    # Train model
+    model = new_model(n_jobs)
+    model.fit(X_train_scaled, y_train)
+
+    # Evaluate
+    metrics = {
+        "samples": int(len(y)),
+        "train_score": round(float(model.score(X_train_scaled, y_train)), 4),
+        "test_score": round(float(model.score(X_test_scaled, y_test)), 4)
+    }
+
+    # Training parallelism must not follow the model into serving, where
+    # joblib dispatch makes every single-row predict slower
+    model.n_jobs = None
+    return model, scaler, metrics
+
+
+class TrainingColumns:
+    """
+    Growable NumPy columns for streamed training reports.
+
+    Preallocated from the expected row count and doubled when exceeded, so
+    loading costs ~16 bytes per report instead of one dict per document.
+    """
+
+    def __init__(self, capacity: int = 0):
+        capacity = max(int(capacity), 1024)
+        self.size = 0
+        self.station_codes = np.empty(capacity, dtype=np.int32)
+        self.times = np.empty(capacity, dtype='datetime64[us]')
+        self.levels = np.empty(capacity, dtype=np.float32)
+
+    def _grow(self, needed: int) -> None:
+        capacity = max(needed, 2 * len(self.levels))
+        for name in ("station_codes", "times", "levels"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+
+    def extend(self, station_codes: np.ndarray, times: np.ndarray, levels: np.ndarray) -> None:
+        end = self.size + len(levels)
+        if end > len(self.levels):
+            self._grow(end)
+        self.station_codes[self.size:end] = station_codes
+        self.times[self.size:end] = times
+        self.levels[self.size:end] = levels
+        self.size = end
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return (
+            self.station_codes[:self.size],
+            self.times[:self.size],
+            self.levels[:self.size]
+        )
+
+
+class LinearCrowdModel:
+    """Linear model over scaled features, produced by StreamingLinearTrainer"""
+
+    def __init__(self, coef: np.ndarray, intercept: float):
+        self.coef_ = coef
+        self.intercept_ = intercept
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
+
+
+class StreamingLinearTrainer:
+    """
+    Incremental learner with memory independent of the number of reports.
+
+    Accumulates the normal equations (X'X, X'y, y'y) for a deterministic
+    80/20 train/test split plus the scaler statistics, then solves for the
+    exact least-squares fit over everything seen. The coefficients are
+    expressed on scaled features so the result drops into the usual
+    scaler.transform -> model.predict path.
+    """
+
+    def __init__(self, n_features: int):
+        size = n_features + 1
+        self.scaler = StandardScaler()
+        self._rows_seen = 0
+        self._stats = {
+            split: {"xtx": np.zeros((size, size)), "xty": np.zeros(size), "yty": 0.0, "n": 0}
+            for split in ("train", "test")
+        }
+
+    def partial_fit(self, X: np.ndarray, y: np.ndarray) -> None:
+        if len(y) == 0:
+            return
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        self.scaler.partial_fit(X)
+
+        augmented = np.column_stack([np.ones(len(y)), X])
+        is_test = (np.arange(self._rows_seen, self._rows_seen + len(y)) % 5) == 0
+        self._rows_seen += len(y)
+        for split, rows in (("train", ~is_test), ("test", is_test)):
+            A, t = augmented[rows], y[rows]
+            stats = self._stats[split]
+            stats["xtx"] += A.T @ A
+            stats["xty"] += A.T @ t
+            stats["yty"] += float(t @ t)
+            stats["n"] += int(rows.sum())
+
+    @property
+    def n_samples(self) -> int:
+        return self._rows_seen
+
+    def _score(self, theta: np.ndarray, split: str) -> float:
+        stats = self._stats[split]
+        if stats["n"] == 0:
+            return float("nan")
+        sse = stats["yty"] - 2 * theta @ stats["xty"] + theta @ stats["xtx"] @ theta
+        sst = stats["yty"] - stats["xty"][0] ** 2 / stats["n"]
+        return 1.0 - sse / sst if sst > 0 else 0.0
+
+    def finalize(self) -> Tuple[LinearCrowdModel, StandardScaler, Dict]:
+        train = self._stats["train"]
+        theta = np.linalg.lstsq(train["xtx"], train["xty"], rcond=None)[0]
+
+        # y = b + x.w with x = z * scale + mean  =>  y = (b + mean.w) + z.(w * scale)
+        intercept, weights = theta[0], theta[1:]
+        model = LinearCrowdModel(
+            coef=weights * self.scaler.scale_,
+            intercept=float(intercept + self.scaler.mean_ @ weights)
+        )
+        metrics = {
+            "samples": self.n_samples,
+            "train_score": round(float(self._score(theta, "train")), 4),
+            "test_score": round(float(self._score(theta, "test")), 4)
+        }
+        return model, self.scaler, metrics
@@ -0,0 +1,162 @@
+# backend/app/services/training_jobs.py
+import asyncio
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional
+
+from ..config import settings
+from ..database import get_database
+from .forecast_materializer import forecast_materializer
+from .prediction_service import prediction_service
+
+COLLECTION = "training_jobs"
+MAX_JOBS_IN_MEMORY = 100
+
+# Coarse progress reported for each stage of a job
+STAGE_PROGRESS = {
+    "queued": 0.0,
+    "loading_data": 0.1,
+    "training": 0.3,
+    "saving": 0.9,
+    "completed": 1.0,
+    "failed": 1.0,
+}
+
+
+class TrainingJobManager:
+    """
+    Runs model training outside the request handlers.
+
+    Jobs load their data on the event loop, then build features and fit the
+    forest in a ProcessPoolExecutor so the API keeps serving while training
+    runs. Job state is written to the training_jobs collection (falling back
+    to memory without a database) so any worker can report it, and the fitted
+    model is hot-swapped into prediction_service (or the station model
+    registry for single-station jobs) when the job completes.
+    """
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs: Dict[str, Dict] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=settings.TRAINING_MAX_WORKERS)
+        return self._executor
+
+    async def _update(self, job: Dict, **changes) -> None:
+        job.update(changes)
+        if "status" in changes:
+            job["progress"] = STAGE_PROGRESS[changes["status"]]
+        job["updated_at"] = datetime.utcnow()
+
+        db = get_database()
+        if db is not None:
+            await db[COLLECTION].replace_one({"_id": job["id"]}, job, upsert=True)
+
+    async def submit(self, station_id: Optional[str] = None) -> Dict:
+        """Queue a training job and return its initial status"""
+        now = datetime.utcnow()
+        job = {
+            "id": uuid.uuid4().hex,
+            "station_id": station_id,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "metrics": None,
+            "error": None,
+        }
+        self._jobs[job["id"]] = job
+        if len(self._jobs) > MAX_JOBS_IN_MEMORY:
+            # Forget the oldest finished jobs
+            finished = [j for j in self._jobs.values() if j["finished_at"] is not None]
+            for old in sorted(finished, key=lambda j: j["created_at"])[:len(self._jobs) - MAX_JOBS_IN_MEMORY]:
+                del self._jobs[old["id"]]
+        await self._update(job, status="queued")
+
+        task = asyncio.create_task(self._run(job))
+        self._tasks[job["id"]] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job["id"], None))
+        return self._public(job)
+
+    async def _run(self, job: Dict) -> None:
+        from .training import fit_model
+
+        try:
+            loop = asyncio.get_running_loop()
+            if settings.TRAINING_MODE == "incremental":
+                # Loading and fitting are interleaved batch by batch
+                await self._update(job, status="training", started_at=datetime.utcnow())
+                result = await prediction_service.fit_incremental(job["station_id"])
+            else:
+                await self._update(job, status="loading_data", started_at=datetime.utcnow())
+                training_data = await prediction_service.load_training_data(job["station_id"])
+                result = None
+                if training_data is not None:
+                    await self._update(job, status="training")
+                    result = await loop.run_in_executor(
+                        self._get_executor(),
+                        fit_model,
+                        *training_data,
+                        datetime.utcnow(),
+                        settings.TRAINING_N_JOBS
+                    )
+
+            if result is None:
+                await self._update(
+                    job,
+                    status="failed",
+                    error="Insufficient data for training",
+                    finished_at=datetime.utcnow()
+                )
+                return
+
+            model, scaler, metrics = result
+            await self._update(job, status="saving", metrics=metrics)
+            if job["station_id"]:
+                # Station models go to the registry; the global model stays
+                await loop.run_in_executor(
+                    None,
+                    prediction_service.save_station_model,
+                    job["station_id"], model, scaler, metrics
+                )
+                # Replace the station's forecasts made with the previous model
+                db = get_database()
+                if db is not None:
+                    await forecast_materializer.materialize(db, [job["station_id"]])
+            else:
+                # Installs exactly the model written under this job's version
+                await loop.run_in_executor(
+                    None,
+                    prediction_service.save_model,
+                    model, scaler, metrics
+                )
+
+            await self._update(job, status="completed", finished_at=datetime.utcnow())
+        except Exception as e:
+            print(f"Training job {job['id']} failed: {e}")
+            await self._update(job, status="failed", error=str(e), finished_at=datetime.utcnow())
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        """Current status of a job, from any worker"""
+        db = get_database()
+        job = await db[COLLECTION].find_one({"_id": job_id}) if db is not None else None
+        if job is None:
+            job = self._jobs.get(job_id)
+        return self._public(job) if job else None
+
+    def _public(self, job: Dict) -> Dict:
+        return {key: value for key, value in job.items() if key != "_id"}
+
+    def shutdown(self) -> None:
+        """Stop the worker processes; running jobs are abandoned"""
+        for task in list(self._tasks.values()):
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+training_jobs = TrainingJobManager()
@@ -0,0 +1,44 @@
+import base64
+import json
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from bson import ObjectId
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(doc: Dict, time_field: Optional[str] = None) -> str:
+    """Opaque cursor pointing just past `doc` in (time_field, _id) order"""
+    position = [doc[time_field].isoformat() if time_field else None, str(doc["_id"])]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], ObjectId]:
+    """(time, _id) of a cursor; raises ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        time_value, object_id = json.loads(base64.urlsafe_b64decode(padded))
+        return (datetime.fromisoformat(time_value) if time_value else None), ObjectId(object_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def seek_filter(
+    position: Tuple[Optional[datetime], ObjectId],
+    time_field: Optional[str] = None,
+    descending: bool = False
+) -> Dict:
+    """Filter for the documents after `position` in (time_field, _id) order"""
+    time_value, object_id = position
+    after = "$lt" if descending else "$gt"
+    if time_field is None:
+        return {"_id": {after: object_id}}
+    return {"$or": [
+        {time_field: {after: time_value}},
+        {time_field: time_value, "_id": {after: object_id}}
+    ]}
+
+def sort_keys(time_field: Optional[str] = None, descending: bool = False):
+    direction = -1 if descending else 1
+    keys = [("_id", direction)]
+    if time_field is not None:
+        keys.insert(0, (time_field, direction))
+    return keys
@@ -0,0 +1,356 @@
+# backend/benchmarks/prediction_benchmark.py
+"""
+Prediction speed and accuracy benchmark.
+
+Generates a synthetic report history (stations x days x reports/hour) into
+an in-process Mongo stand-in (mongomock-motor) and measures, per model and
+prediction path:
+  * train_model_with_data wall time and peak traced memory (full and
+    incremental training modes)
+  * predict_crowd_level and get_hourly_predictions latency percentiles,
+    throughput and peak traced memory, with the prediction cache disabled
+  * rolling-origin backtest MAE: for each fold the models are fitted on the
+    reports before the origin and scored on the following horizon
+
+Results can be saved as JSON and compared against an earlier run:
+
+    python benchmarks/prediction_benchmark.py --save baseline.json
+    python benchmarks/prediction_benchmark.py --compare baseline.json
+
+Usage (from the Backend directory, after pip install -r benchmarks/requirements.txt):
+    python benchmarks/prediction_benchmark.py [--stations 10] [--days 30] [--reports-per-hour 2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+try:
+    from mongomock_motor import AsyncMongoMockClient
+except ImportError:
+    sys.exit("mongomock-motor is required: pip install -r benchmarks/requirements.txt")
+
+from app import database
+from app.config import settings
+from app.services import features, training
+from app.services.compiled_forest import compile_forest
+from app.services.feature_store import feature_store
+from app.services.model_store import model_store
+from app.services.prediction_cache import prediction_cache
+from app.services.prediction_service import prediction_service
+
+INSERT_CHUNK = 5000
+
+
+def generate_reports(stations: int, days: int, reports_per_hour: float, end: datetime, seed: int):
+    """
+    Synthetic history with per-station base levels, rush-hour peaks, quieter
+    nights and weekends, and noise. Returns (station_codes, times, levels).
+    """
+    rng = np.random.default_rng(seed)
+    start = np.datetime64(end - timedelta(days=days), 'h')
+    slots = start + np.arange(days * 24).astype('timedelta64[h]')
+    time_features = features.time_feature_matrix(slots.astype('datetime64[us]'))
+    hour, is_weekend = time_features[:, 0], time_features[:, 2]
+    morning, evening = time_features[:, 5], time_features[:, 6]
+    night = (hour < 6) | (hour >= 23)
+
+    activity = np.where(night, 0.2, 1.0) + morning + evening
+    pattern = 1.2 * morning + 1.4 * evening + 0.5 * is_weekend * (hour >= 11) * (hour <= 20) - 0.8 * night
+
+    codes, times, levels = [], [], []
+    for station in range(stations):
+        base = rng.uniform(1.5, 3.5)
+        counts = rng.poisson(reports_per_hour * activity)
+        slot = np.repeat(np.arange(len(slots)), counts)
+        offsets = rng.integers(0, 3_600_000, len(slot)).astype('timedelta64[ms]')
+        expected = base + pattern[slot] + rng.normal(0, 0.7, len(slot))
+        codes.append(np.full(len(slot), station))
+        times.append(slots[slot].astype('datetime64[ms]') + offsets)
+        levels.append(np.clip(np.rint(expected), 1, 5))
+
+    return np.concatenate(codes), np.concatenate(times), np.concatenate(levels)
+
+
+async def load_database(db, codes, times, levels, stations: int):
+    """Insert stations and reports; returns the station id strings"""
+    result = await db.stations.insert_many([
+        {"name": f"Station {i}", "line": "Bench Line", "latitude": 40.7 + i * 0.001,
+         "longitude": -74.0 + i * 0.001, "station_type": "metro", "created_at": datetime.utcnow()}
+        for i in range(stations)
+    ])
+    station_ids = [str(_id) for _id in result.inserted_ids]
+
+    for i in range(0, len(levels), INSERT_CHUNK):
+        await db.crowd_reports.insert_many([
+            {"station_id": station_ids[code], "user_id": "benchmark",
+             "crowd_level": int(level), "description": None, "created_at": created_at}
+            for code, created_at, level in zip(
+                codes[i:i + INSERT_CHUNK].tolist(),
+                times[i:i + INSERT_CHUNK].tolist(),
+                levels[i:i + INSERT_CHUNK].tolist()
+            )
+        ])
+    await feature_store.rebuild(db)
+    return station_ids
+
+
+def latency_summary(samples_ms, elapsed_s: float) -> dict:
+    samples = np.asarray(samples_ms)
+    return {
+        "calls": len(samples),
+        "mean_ms": round(float(samples.mean()), 3),
+        **{f"p{q}_ms": round(float(np.percentile(samples, q)), 3) for q in (50, 90, 99)},
+        "throughput_per_s": round(len(samples) / elapsed_s, 1)
+    }
+
+
+async def traced_peak_mb(make_call, calls: int) -> float:
+    """Peak Python/NumPy allocation (MB) over `calls` awaited calls"""
+    tracemalloc.start()
+    try:
+        for _ in range(calls):
+            await make_call()
+        return round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+    finally:
+        tracemalloc.stop()
+
+
+async def bench_calls(make_call, calls: int, memory_calls: int) -> dict:
+    samples = []
+    started = time.perf_counter()
+    for _ in range(calls):
+        t = time.perf_counter()
+        await make_call()
+        samples.append((time.perf_counter() - t) * 1000)
+    summary = latency_summary(samples, time.perf_counter() - started)
+    summary["peak_memory_mb"] = await traced_peak_mb(make_call, memory_calls)
+    return summary
+
+
+async def bench_training(mode: str) -> tuple:
+    """Fitted (model, scaler) and training time/peak memory for a training mode"""
+    settings.TRAINING_MODE = mode
+    started = time.perf_counter()
+    await prediction_service.train_model_with_data()
+    elapsed = time.perf_counter() - started
+    bundle = (prediction_service.model, prediction_service.scaler)
+
+    tracemalloc.start()
+    try:
+        await prediction_service.train_model_with_data()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return bundle, {"seconds": round(elapsed, 3), "peak_memory_mb": round(peak / 1e6, 2)}
+
+
+async def bench_paths(paths: dict, station_ids, args) -> dict:
+    rnd = random.Random(args.seed)
+
+    async def single():
+        await prediction_service.predict_crowd_level(
+            rnd.choice(station_ids),
+            datetime.utcnow() + timedelta(hours=rnd.randint(1, 24))
+        )
+
+    async def hourly():
+        await prediction_service.get_hourly_predictions(rnd.choice(station_ids), args.hours)
+
+    results = {}
+    for path, (bundle, engine) in paths.items():
+        settings.INFERENCE_ENGINE = engine
+        prediction_service.install_model(*bundle)
+        await single()  # warm the feature store mirror and compiled evaluator
+        results[path] = {
+            "predict_crowd_level": await bench_calls(single, args.requests, args.memory_calls),
+            "get_hourly_predictions": await bench_calls(hourly, args.hourly_requests, args.memory_calls)
+        }
+    return results
+
+
+def backtest(codes, times, levels, end: datetime, args) -> dict:
+    """Rolling-origin MAE per model over `folds` consecutive horizons"""
+    ticks = times.astype('datetime64[us]')
+    horizon = timedelta(hours=args.horizon_hours)
+    errors = {}
+
+    for fold in range(args.folds, 0, -1):
+        origin = end - fold * horizon
+        origin64 = np.datetime64(origin, 'us')
+        train = ticks < origin64
+        test = (ticks >= origin64) & (ticks < np.datetime64(origin + horizon, 'us'))
+        if train.sum() < training.MIN_TRAINING_SAMPLES or not test.any():
+            continue
+
+        # Features of test reports use only history before the origin, like the feature store
+        window = train & (ticks >= np.datetime64(origin - timedelta(days=settings.FEATURE_WINDOW_DAYS), 'us'))
+        n_stations = int(codes.max()) + 1
+        historical_avg = np.full((n_stations, 24), features.DEFAULT_CROWD_LEVEL)
+        recent_trend = np.zeros((n_stations, 24))
+        for station in range(n_stations):
+            rows = window & (codes == station)
+            historical_avg[station], recent_trend[station] = features.hourly_profile(
+                ticks[rows], levels[rows], origin
+            )
+        time_features = features.time_feature_matrix(ticks[test])
+        hours = time_features[:, 0].astype(np.int64)
+        X = np.column_stack([
+            time_features,
+            historical_avg[codes[test], hours],
+            recent_trend[codes[test], hours]
+        ])
+        actual = levels[test]
+
+        forest, forest_scaler, _ = training.fit_model(codes[train], ticks[train], levels[train], origin)
+        trainer = training.StreamingLinearTrainer(len(features.FEATURE_COLUMNS))
+        trainer.partial_fit(
+            features.build_training_features(codes[train], ticks[train], levels[train], origin),
+            levels[train]
+        )
+        linear, linear_scaler, _ = trainer.finalize()
+        compiled = compile_forest(forest, forest_scaler)
+
+        predictions = {
+            "forest": forest.predict(forest_scaler.transform(X)),
+            "linear": linear.predict(linear_scaler.transform(X)),
+            "rule_based": features.rule_based_predictions(X),
+            "fallback": np.array([
+                prediction_service._fallback_prediction(t)["predicted_crowd_level"]
+                for t in ticks[test].astype(object)
+            ]),
+            "historical_average": X[:, 7]
+        }
+        if compiled is not None:
+            predictions["forest_compiled"] = compiled.predict(X)
+
+        for model, predicted in predictions.items():
+            mae = float(np.abs(np.clip(predicted, 1.0, 5.0) - actual).mean())
+            errors.setdefault(model, []).append(mae)
+
+    return {
+        model: {"mae": round(float(np.mean(maes)), 4), "folds": [round(m, 4) for m in maes]}
+        for model, maes in errors.items()
+    }
+
+
+def print_results(results: dict) -> None:
+    data = results["data"]
+    print(f"data: {data['stations']} stations, {data['days']} days, {data['reports']} reports")
+
+    print("\ntraining (seconds, peak traced MB):")
+    for mode, stats in results["training"].items():
+        print(f"  {mode:<12} {stats['seconds']:>9.3f} s {stats['peak_memory_mb']:>9.2f} MB")
+
+    print("\nlatency (ms) / throughput (calls/s) / peak traced MB:")
+    for path, calls in results["latency"].items():
+        for name, stats in calls.items():
+            print(
+                f"  {path:<16} {name:<24} p50 {stats['p50_ms']:>8.3f}  p90 {stats['p90_ms']:>8.3f}"
+                f"  p99 {stats['p99_ms']:>8.3f}  {stats['throughput_per_s']:>9.1f}/s"
+                f"  {stats['peak_memory_mb']:>7.2f} MB"
+            )
+
+    print(f"\nbacktest MAE ({results['backtest_folds']} folds of {results['horizon_hours']} h):")
+    for model, stats in sorted(results["backtest"].items(), key=lambda item: item[1]["mae"]):
+        print(f"  {model:<20} {stats['mae']:.4f}")
+
+
+def compare(results: dict, baseline: dict) -> None:
+    """Print relative changes of the headline numbers against a saved run"""
+    def change(new, old):
+        return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+    print("\nchange vs baseline:")
+    for mode, stats in results["training"].items():
+        old = baseline.get("training", {}).get(mode)
+        if old:
+            print(f"  training {mode:<12} time {change(stats['seconds'], old['seconds'])}")
+    for path, calls in results["latency"].items():
+        for name, stats in calls.items():
+            old = baseline.get("latency", {}).get(path, {}).get(name)
+            if old:
+                print(
+                    f"  {path:<16} {name:<24} p50 {change(stats['p50_ms'], old['p50_ms'])}"
+                    f"  p99 {change(stats['p99_ms'], old['p99_ms'])}"
+                    f"  throughput {change(stats['throughput_per_s'], old['throughput_per_s'])}"
+                )
+    for model, stats in results["backtest"].items():
+        old = baseline.get("backtest", {}).get(model)
+        if old:
+            print(f"  backtest {model:<20} MAE {stats['mae']:.4f} ({change(stats['mae'], old['mae'])})")
+
+
+async def run(args) -> dict:
+    end = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    codes, times, levels = generate_reports(args.stations, args.days, args.reports_per_hour, end, args.seed)
+
+    database.database = AsyncMongoMockClient()["prediction_benchmark"]
+    model_store.root = tempfile.mkdtemp(prefix="prediction-benchmark-")
+    # Keep installed models in place and measure the uncached path
+    settings.MODEL_RELOAD_CHECK_SECONDS = 10 ** 9
+    prediction_cache.enabled = False
+
+    station_ids = await load_database(database.database, codes, times, levels, args.stations)
+
+    forest, forest_stats = await bench_training("full")
+    linear, linear_stats = await bench_training("incremental")
+
+    paths = {
+        "rule_based": ((None, None), "sklearn"),
+        "forest_sklearn": (forest, "sklearn"),
+        "forest_compiled": (forest, "compiled"),
+        "linear": (linear, "sklearn"),
+    }
+
+    return {
+        "data": {"stations": args.stations, "days": args.days, "reports": int(len(levels))},
+        "training": {"full": forest_stats, "incremental": linear_stats},
+        "latency": await bench_paths(paths, station_ids, args),
+        "backtest": backtest(codes, times, levels, end, args),
+        "backtest_folds": args.folds,
+        "horizon_hours": args.horizon_hours,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", type=int, default=10)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--reports-per-hour", type=float, default=2.0, help="per station, before the daily pattern")
+    parser.add_argument("--requests", type=int, default=500, help="predict_crowd_level calls per path")
+    parser.add_argument("--hourly-requests", type=int, default=100, help="get_hourly_predictions calls per path")
+    parser.add_argument("--hours", type=int, default=24, help="horizon of get_hourly_predictions")
+    parser.add_argument("--memory-calls", type=int, default=20, help="calls traced for peak memory")
+    parser.add_argument("--folds", type=int, default=4)
+    parser.add_argument("--horizon-hours", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print_results(results)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
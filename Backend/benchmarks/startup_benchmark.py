@@ -0,0 +1,135 @@
+# backend/benchmarks/startup_benchmark.py
+"""
+API cold-start benchmark.
+
+Measures, in fresh interpreters:
+  * import time of `app.main`, broken down per module (python -X importtime)
+  * time from launching uvicorn to the first 200 response on /health
+
+and fails when the ML stack (numpy, pandas, scikit-learn) is imported by
+`app.main` or when a measurement exceeds its threshold, so start-up
+regressions are caught before they reach the autoscaled deployment.
+
+Usage (from the Backend directory):
+    python benchmarks/startup_benchmark.py [--runs 5] [--max-import-ms 1500]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("numpy", "pandas", "sklearn", "scipy", "joblib")
+
+
+def run_python(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def measure_import(runs: int) -> float:
+    """Median wall time (ms) of `import app.main` in a fresh interpreter"""
+    code = (
+        "import time; t = time.perf_counter(); import app.main; "
+        "print((time.perf_counter() - t) * 1000)"
+    )
+    return statistics.median(float(run_python(code).stdout) for _ in range(runs))
+
+
+def heavy_modules_loaded() -> list:
+    """ML modules that end up in sys.modules after `import app.main`"""
+    code = (
+        "import sys, app.main; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    return [m for m in run_python(code).stdout.strip().split(",") if m]
+
+
+def import_profile(top: int) -> list:
+    """The `top` slowest modules by cumulative import time (us)"""
+    stderr = run_python("import app.main", "-X", "importtime").stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_response(timeout: float) -> float:
+    """Time (ms) from spawning uvicorn to the first successful /health"""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=0.5) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"/health did not answer within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="modules to list in the import profile")
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    parser.add_argument("--max-first-response-ms", type=float, default=None)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    failures = []
+
+    import_ms = measure_import(args.runs)
+    print(f"import app.main (median of {args.runs}): {import_ms:.1f} ms")
+
+    print("\nslowest imports (cumulative us, self us, module):")
+    for cumulative_us, self_us, name in import_profile(args.top):
+        print(f"  {cumulative_us:>10} {self_us:>10}  {name}")
+
+    heavy = heavy_modules_loaded()
+    print(f"\nML modules loaded by app.main: {', '.join(heavy) or 'none'}")
+    if heavy:
+        failures.append(f"app.main imports {', '.join(heavy)}")
+
+    first_response = statistics.median(measure_first_response(args.timeout) for _ in range(args.runs))
+    print(f"time to first /health response (median of {args.runs}): {first_response:.1f} ms")
+
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        failures.append(f"import time {import_ms:.1f} ms > {args.max_import_ms} ms")
+    if args.max_first_response_ms is not None and first_response > args.max_first_response_ms:
+        failures.append(f"first response {first_response:.1f} ms > {args.max_first_response_ms} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
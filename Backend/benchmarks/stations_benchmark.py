@@ -0,0 +1,187 @@
+# backend/benchmarks/stations_benchmark.py
+"""
+Station listing benchmark.
+
+Seeds stations with a recent report history and their hourly rollups into
+an in-process Mongo stand-in (mongomock-motor) and times
+GET /api/stations for growing page sizes, next to the previous approach of
+one current-level query per station.
+
+Every database round trip is counted and can be delayed by --rtt-ms to
+model the network hop to a real MongoDB; with the batched lookup the
+number of round trips, and so the latency, no longer grows with the page.
+
+Usage (from the Backend directory, after pip install -r benchmarks/requirements.txt):
+    python benchmarks/stations_benchmark.py [--stations 1000] [--pages 10,100,1000] [--rtt-ms 1]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+try:
+    from mongomock_motor import AsyncMongoMockClient
+except ImportError:
+    sys.exit("mongomock-motor is required: pip install -r benchmarks/requirements.txt")
+
+from fastapi import Response
+
+from app import database
+from app.api.stations import get_stations
+from app.services.report_rollups import report_rollups
+
+
+class RoundTrips:
+    """Counts database round trips and optionally delays each one"""
+
+    def __init__(self, rtt_ms: float):
+        self.delay = rtt_ms / 1000
+        self.count = 0
+
+    async def hop(self):
+        self.count += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+
+
+class _Cursor:
+    def __init__(self, cursor, trips: RoundTrips):
+        self._cursor = cursor
+        self._trips = trips
+
+    def __getattr__(self, name):
+        attr = getattr(self._cursor, name)
+        if name in ("skip", "limit", "sort", "batch_size"):
+            return lambda *args, **kwargs: _Cursor(attr(*args, **kwargs), self._trips)
+        return attr
+
+    async def to_list(self, length=None):
+        await self._trips.hop()
+        return await self._cursor.to_list(length=length)
+
+
+class _Collection:
+    def __init__(self, collection, trips: RoundTrips):
+        self._collection = collection
+        self._trips = trips
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+    def find(self, *args, **kwargs):
+        return _Cursor(self._collection.find(*args, **kwargs), self._trips)
+
+    def aggregate(self, *args, **kwargs):
+        return _Cursor(self._collection.aggregate(*args, **kwargs), self._trips)
+
+    async def find_one(self, *args, **kwargs):
+        await self._trips.hop()
+        return await self._collection.find_one(*args, **kwargs)
+
+
+class _Database:
+    def __init__(self, db, trips: RoundTrips):
+        self._db = db
+        self._trips = trips
+
+    def __getattr__(self, name):
+        return self[name]
+
+    def __getitem__(self, name):
+        return _Collection(self._db[name], self._trips)
+
+
+async def seed(db, stations: int, reports_per_station: int, seed: int) -> None:
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    result = await db.stations.insert_many([
+        {
+            "name": f"Station {i}",
+            "line": f"Line {i % 12}",
+            "latitude": 40.0 + rng.random(),
+            "longitude": -74.0 + rng.random(),
+            "station_type": "metro",
+            "created_at": now
+        }
+        for i in range(stations)
+    ])
+    reports = [
+        {
+            "station_id": str(station_id),
+            "user_id": "benchmark",
+            "crowd_level": rng.randint(1, 5),
+            "description": None,
+            "created_at": now - timedelta(minutes=rng.uniform(0, 120))
+        }
+        for station_id in result.inserted_ids
+        for _ in range(reports_per_station)
+    ]
+    await db.crowd_reports.insert_many(reports)
+    for report in reports:
+        await report_rollups.record_report(db, report["station_id"], report["created_at"], report["crowd_level"])
+
+
+async def per_station_listing(db, limit: int):
+    """The previous get_stations: one current-level query per station"""
+    stations = await db.stations.find().limit(limit).to_list(length=limit)
+    return [await report_rollups.current_level(db, str(station["_id"])) for station in stations]
+
+
+async def time_calls(call, trips: RoundTrips, repeat: int) -> dict:
+    await call()
+    trips.count = 0
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "round_trips": trips.count // repeat,
+        "p50_ms": samples[len(samples) // 2],
+        "max_ms": samples[-1]
+    }
+
+
+async def run(args) -> None:
+    raw = AsyncMongoMockClient()["stations_benchmark"]
+    await seed(raw, args.stations, args.reports_per_station, args.seed)
+
+    trips = RoundTrips(args.rtt_ms)
+    db = _Database(raw, trips)
+    database.database = db
+
+    print(f"{args.stations} stations, {args.reports_per_station} reports each, rtt {args.rtt_ms} ms")
+    print(f"{'page':>6} {'approach':<12} {'trips':>6} {'p50 ms':>9} {'max ms':>9}")
+    for page in args.pages:
+        approaches = {
+            "batched": lambda: get_stations(Response(), skip=0, limit=page),
+            "per-station": lambda: per_station_listing(db, page)
+        }
+        for name, call in approaches.items():
+            result = await time_calls(call, trips, args.repeat)
+            print(f"{page:>6} {name:<12} {result['round_trips']:>6} {result['p50_ms']:>9.2f} {result['max_ms']:>9.2f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", type=int, default=1000)
+    parser.add_argument("--reports-per-station", type=int, default=10)
+    parser.add_argument("--pages", type=lambda value: [int(page) for page in value.split(",")], default=[10, 100, 1000])
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="simulated latency added to every round trip")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
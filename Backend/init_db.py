@@ -20,8 +20,34 @@ def init_mongodb():
         db.users.create_index([("email", 1)], unique=True)
         db.users.create_index([("username", 1)], unique=True)
         db.stations.create_index([("name", 1), ("line", 1)])
-        db.crowd_reports.create_index([("station_id", 1), ("created_at", -1)])
-        db.predictions.create_index([("station_id", 1), ("prediction_time", -1)])
+        # _id breaks ties so cursor pagination seeks on the index
+        db.crowd_reports.create_index([("station_id", 1), ("created_at", -1), ("_id", -1)])
+        db.crowd_reports.create_index([("created_at", -1), ("_id", -1)])
+        db.predictions.create_index([("station_id", 1), ("prediction_time", -1), ("_id", -1)])
+        db.crowd_report_hourly.create_index([("station_id", 1), ("hour", 1)])
+        
+        # One materialized forecast per station and hour slot, so concurrent
+        # refreshes upsert the same row; earlier duplicates are dropped first
+        duplicates = db.predictions.aggregate([
+            {"$match": {"source": "materialized"}},
+            {"$group": {"_id": {"station_id": "$station_id", "prediction_time": "$prediction_time"},
+                        "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}}
+        ])
+        for group in duplicates:
+            db.predictions.delete_many({"_id": {"$in": group["ids"][1:]}})
+        db.predictions.create_index(
+            [("station_id", 1), ("prediction_time", 1)],
+            unique=True,
+            partialFilterExpression={"source": "materialized"}
+        )
+        
+        # GeoJSON location for nearby-station queries, backfilled for older stations
+        db.stations.update_many(
+            {"location": {"$exists": False}},
+            [{"$set": {"location": {"type": "Point", "coordinates": ["$longitude", "$latitude"]}}}]
+        )
+        db.stations.create_index([("location", "2dsphere")])
         
         print("MongoDB indexes created successfully")
 
@@ -52,6 +78,8 @@ def init_mongodb():
                 {"name": "Stadium Station", "line": "Red Line", "latitude": 40.7505, "longitude": -73.9934,
                  "station_type": "metro", "created_at": utc_now()},
             ]
+            for station in stations:
+                station["location"] = {"type": "Point", "coordinates": [station["longitude"], station["latitude"]]}
             
             result = db.stations.insert_many(stations)
             print(f"Sample stations added to database: {len(result.inserted_ids)} stations")
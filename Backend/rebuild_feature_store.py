@@ -0,0 +1,17 @@
+# backend/rebuild_feature_store.py
+import asyncio
+from app.database import connect_to_mongo, close_mongo_connection, get_database
+from app.services.feature_store import feature_store
+
+async def rebuild_feature_store():
+    """Backfill the station_features collection from crowd_reports"""
+    await connect_to_mongo()
+    try:
+        stations = await feature_store.rebuild(get_database())
+        print(f"Feature store rebuilt for {stations} stations "
+              f"(last {feature_store.window_days} days of crowd reports)")
+    finally:
+        await close_mongo_connection()
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_feature_store())
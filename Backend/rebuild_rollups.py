@@ -0,0 +1,23 @@
+# backend/rebuild_rollups.py
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+from app.database import connect_to_mongo, close_mongo_connection, get_database
+from app.services.report_rollups import report_rollups
+
+async def rebuild_rollups(days=None):
+    """Backfill the crowd_report_hourly collection from crowd_reports"""
+    await connect_to_mongo()
+    try:
+        since = datetime.utcnow() - timedelta(days=days) if days else None
+        written = await report_rollups.rebuild(get_database(), since)
+        scope = f"last {days} days" if days else "all history"
+        print(f"Hourly rollups rebuilt: {written} station-hours ({scope})")
+    finally:
+        await close_mongo_connection()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild hourly crowd report rollups")
+    parser.add_argument("--days", type=int, default=None, help="only rebuild the last N days")
+    args = parser.parse_args()
+    asyncio.run(rebuild_rollups(args.days))
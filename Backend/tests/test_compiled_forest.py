@@ -0,0 +1,46 @@
+# backend/tests/test_compiled_forest.py
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.services import features, training
+from app.services.compiled_forest import compile_forest
+
+NOW = datetime(2026, 10, 1)
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    rng = np.random.default_rng(13)
+    n = 2000
+    codes = rng.integers(0, 10, n)
+    times = np.datetime64("2026-08-20", "us") + rng.integers(0, 40 * 86400, n).astype("timedelta64[s]")
+    levels = rng.integers(1, 6, n).astype(np.float64)
+    model, scaler, _ = training.fit_model(codes, times, levels, NOW, n_jobs=1)
+    return model, scaler, features.build_training_features(codes, times, levels, NOW)
+
+
+def test_compiled_forest_matches_sklearn_on_training_rows(fitted):
+    model, scaler, X = fitted
+
+    compiled = compile_forest(model, scaler)
+
+    assert compiled is not None
+    np.testing.assert_allclose(compiled.predict(X), model.predict(scaler.transform(X)), rtol=0, atol=1e-9)
+
+
+def test_compiled_forest_matches_sklearn_off_distribution(fitted):
+    model, scaler, X = fitted
+    rng = np.random.default_rng(14)
+    # Random rows spanning past the training ranges exercise every split direction
+    low, high = X.min(axis=0), X.max(axis=0)
+    span = high - low
+    X_random = rng.uniform(low - span, high + span, size=(500, X.shape[1]))
+
+    compiled = compile_forest(model, scaler)
+
+    np.testing.assert_allclose(
+        compiled.predict(X_random), model.predict(scaler.transform(X_random)), rtol=0, atol=1e-9
+    )
+    assert compiled.max_error(model, scaler, X_random) <= 1e-9
@@ -0,0 +1,64 @@
+# backend/tests/test_features.py
+from datetime import datetime
+
+import numpy as np
+
+from app.services import features
+from app.services.prediction_service import CrowdPredictionService
+
+from conftest import synthetic_reports
+
+
+def per_row_features(service, reports):
+    """The previous training builder: one history scan per report"""
+    rows = []
+    for report in reports:
+        history = [
+            r for r in reports
+            if r["station_id"] == report["station_id"] and r["created_at"] < report["created_at"]
+        ]
+        values = {
+            **service.extract_time_features(report["created_at"]),
+            **service.calculate_historical_features(history, report["created_at"])
+        }
+        rows.append([values[column] for column in features.FEATURE_COLUMNS])
+    return np.array(rows, dtype=np.float64)
+
+
+def vectorized_features(reports):
+    _, station_codes = np.unique([r["station_id"] for r in reports], return_inverse=True)
+    return features.build_training_features(
+        station_codes,
+        features.to_datetime64(r["created_at"] for r in reports),
+        np.array([r["crowd_level"] for r in reports], dtype=np.float64),
+        datetime.utcnow()
+    )
+
+
+def test_training_features_match_per_row_builder():
+    reports = synthetic_reports(stations=1, per_station=150, days=20, seed=3, ties=30)
+
+    expected = per_row_features(CrowdPredictionService(), reports)
+
+    np.testing.assert_allclose(vectorized_features(reports), expected, rtol=0, atol=1e-9)
+
+
+def test_training_features_scope_history_to_station():
+    reports = synthetic_reports(stations=3, per_station=60, days=20, seed=4, ties=10)
+
+    expected = per_row_features(CrowdPredictionService(), reports)
+
+    np.testing.assert_allclose(vectorized_features(reports), expected, rtol=0, atol=1e-9)
+
+
+def test_tied_reports_do_not_see_each_other():
+    when = datetime(2026, 3, 2, 8, 30)
+    X = features.build_training_features(
+        np.zeros(3, dtype=np.int64),
+        features.to_datetime64([when, when, when]),
+        np.array([1.0, 5.0, 3.0]),
+        datetime(2026, 3, 3)
+    )
+
+    historical_avg = X[:, features.FEATURE_COLUMNS.index("historical_avg")]
+    assert (historical_avg == features.DEFAULT_CROWD_LEVEL).all()
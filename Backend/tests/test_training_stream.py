@@ -0,0 +1,56 @@
+# backend/tests/test_training_stream.py
+import asyncio
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.services import features
+from app.services.prediction_service import CrowdPredictionService
+
+from conftest import synthetic_reports
+
+
+def sorted_rows(X):
+    """Rows in a canonical order; tied reports produce identical rows"""
+    return X[np.lexsort(X.T[::-1])]
+
+
+def full_build(reports, now):
+    _, station_codes = np.unique([r["station_id"] for r in reports], return_inverse=True)
+    return features.build_training_features(
+        station_codes,
+        features.to_datetime64(r["created_at"] for r in reports),
+        np.array([r["crowd_level"] for r in reports], dtype=np.float64),
+        now
+    )
+
+
+async def stream(service, batch_size):
+    return [batch async for batch in service.stream_training_batches(batch_size=batch_size)]
+
+
+@pytest.mark.parametrize("batch_size", [7, 64, 10_000])
+def test_streamed_features_match_full_build(mongo_db, batch_size):
+    reports = synthetic_reports(stations=4, per_station=80, days=20, seed=8, ties=15)
+    asyncio.run(mongo_db.crowd_reports.insert_many([dict(report) for report in reports]))
+    now = datetime.utcnow()
+
+    batches = asyncio.run(stream(CrowdPredictionService(), batch_size))
+
+    assert sum(len(levels) for _, _, levels in batches) == len(reports)
+    builder = features.StreamingFeatureBuilder(now)
+    streamed = np.vstack([builder.transform(*batch) for batch in batches])
+    np.testing.assert_allclose(
+        sorted_rows(streamed), sorted_rows(full_build(reports, now)), rtol=0, atol=1e-9
+    )
+
+
+def test_batches_never_split_tied_reports(mongo_db):
+    reports = synthetic_reports(stations=2, per_station=40, days=10, seed=9, ties=20)
+    asyncio.run(mongo_db.crowd_reports.insert_many([dict(report) for report in reports]))
+
+    batches = asyncio.run(stream(CrowdPredictionService(), 5))
+
+    for (codes, times, _), (next_codes, next_times, _) in zip(batches, batches[1:]):
+        assert (codes[-1], times[-1]) != (next_codes[0], next_times[0])